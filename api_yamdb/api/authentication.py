@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from reviews.models import TokenUser, User, users_updated
+from .cache import get_cache
+
+USER_CLAIMS = ('username', 'role', 'is_superuser')
+USER_STATE = USER_CLAIMS + ('is_active',)
+DELETED = 'deleted'
+
+
+def state_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def get_user_state(user):
+    return {field: getattr(user, field) for field in USER_STATE}
+
+
+def load_user_state(user_id):
+    """Состояние пользователя из БД; кладется в кэш, если его там нет."""
+    state = User.objects.filter(pk=user_id).values(*USER_STATE).first()
+    get_cache().add(
+        state_key(user_id), state or DELETED,
+        timeout=settings.AUTH_USER_STATE_TTL
+    )
+    return state or DELETED
+
+
+def add_user_claims(token, user):
+    """Кладет в токен все, что нужно для проверки прав."""
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    get_cache().set(
+        state_key(user.pk), get_user_state(user),
+        timeout=settings.AUTH_USER_STATE_TTL
+    )
+    return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Собирает пользователя без запроса к БД: права берутся из состояния
+    пользователя в кэше, которое обновляют сигналы модели User.
+    Если состояния в кэше нет (вытеснено, истекло, другой процесс),
+    оно читается из БД, claims токена без проверки не используются.
+    Токены без claims проверяются по БД, как в JWTAuthentication.
+    """
+    def get_user(self, validated_token):
+        claims = {
+            claim: validated_token.get(claim) for claim in USER_CLAIMS
+        }
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or None in claims.values():
+            return super().get_user(validated_token)
+
+        state = get_cache().get(state_key(user_id))
+        if state is None:
+            state = load_user_state(user_id)
+        if state == DELETED:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        if not state['is_active']:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        claims = {claim: state[claim] for claim in USER_CLAIMS}
+
+        user = TokenUser(**{api_settings.USER_ID_FIELD: user_id}, **claims)
+        user._state.adding = False
+        return user
+
+
+def remember_user_state(state):
+    # Новое состояние видно после коммита, тогда же его видят и токены
+    transaction.on_commit(lambda: get_cache().set_many(
+        state, timeout=settings.AUTH_USER_STATE_TTL
+    ))
+
+
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    remember_user_state({state_key(instance.pk): get_user_state(instance)})
+
+
+def user_deleted(sender, instance, **kwargs):
+    remember_user_state({state_key(instance.pk): DELETED})
+
+
+def users_bulk_updated(sender, pks, **kwargs):
+    # Новое состояние прочитается из БД при следующем запросе
+    keys = [state_key(pk) for pk in pks]
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
+
+
+def connect_signals():
+    post_save.connect(user_saved, sender=User)
+    post_delete.connect(user_deleted, sender=User)
+    users_updated.connect(users_bulk_updated, sender=User)
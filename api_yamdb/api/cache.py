@@ -0,0 +1,221 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework import status
+from rest_framework.response import Response
+
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User, users_updated)
+from .metrics import registry
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_versions(groups):
+    """
+    Текущие версии групп ресурсов. Версия входит в ключ ответа,
+    поэтому смена версии группы сбрасывает только ее ответы:
+    старые записи больше не читаются и вытесняются по LRU/TTL.
+    Версии - случайные токены, а не счетчики: если бэкенд вытеснит
+    версию, новая не совпадет ни с одной из прежних.
+    """
+    cache = get_cache()
+    keys = [f'api:version:{group}' for group in groups]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*groups):
+    """
+    Сбрасывает группы после коммита, когда новые данные уже видны.
+    Реплики могут получить изменение позже, поэтому REPLICA_PIN_SECONDS
+    группы читаются из основной базы (см. recently_changed).
+    """
+    def set_versions():
+        cache = get_cache()
+        cache.set_many(
+            {f'api:version:{group}': uuid.uuid4().hex for group in groups},
+            timeout=None
+        )
+        if settings.DATABASE_REPLICAS and settings.REPLICA_PIN_SECONDS:
+            cache.set_many(
+                {f'api:changed:{group}': True for group in groups},
+                timeout=settings.REPLICA_PIN_SECONDS
+            )
+    transaction.on_commit(set_versions)
+
+
+def recently_changed(groups):
+    """Менялась ли какая-то из групп за последние REPLICA_PIN_SECONDS."""
+    return bool(
+        get_cache().get_many([f'api:changed:{group}' for group in groups])
+    )
+
+
+def resource_group(name, pk):
+    """Группа одного объекта: '01' и 1 из URL дают одну и ту же группу."""
+    return f'{name}:{int(pk)}' if str(pk).isdigit() else f'{name}:{pk}'
+
+
+def get_role(user):
+    if not user.is_authenticated:
+        return 'anonymous'
+    return f'{user.role}:superuser' if user.is_superuser else user.role
+
+
+def make_key(request, groups):
+    versions = ','.join(map(str, get_versions(groups)))
+    query = '&'.join(sorted(request.META.get('QUERY_STRING', '').split('&')))
+    raw = '|'.join((
+        request.get_host(), request.path, query,
+        get_role(request.user), versions,
+    ))
+    return 'api:response:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+class CachedResponseMixin:
+    """
+    Кэширует данные успешных ответов на чтение.
+    Ключ - хост, путь, query string, роль и версии групп
+    из get_cache_groups(), которые сбрасываются сигналами моделей.
+    """
+    def get_cache_groups(self):
+        raise NotImplementedError
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not settings.API_CACHE_ENABLED:
+            return handler(request, *args, **kwargs)
+        key = make_key(request, self.get_cache_groups())
+        data = get_cache().get(key)
+        registry.inc('api_cache_requests_total', {
+            'result': 'miss' if data is None else 'hit'
+        })
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            get_cache().set(key, response.data)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CachedReadMixin(CachedListMixin, CachedRetrieveMixin):
+    pass
+
+
+def title_saved(sender, instance, **kwargs):
+    invalidate('titles', resource_group('title', instance.pk))
+
+
+def title_deleted(sender, instance, **kwargs):
+    invalidate(
+        'titles', resource_group('title', instance.pk),
+        resource_group('reviews', instance.pk)
+    )
+
+
+def genre_title_saved(sender, instance, **kwargs):
+    invalidate('titles', resource_group('title', instance.title_id))
+
+
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate('titles', resource_group('title', instance.pk))
+    elif pk_set:
+        invalidate('titles', *(resource_group('title', pk) for pk in pk_set))
+    else:
+        # clear() со стороны жанра: затронутые произведения неизвестны
+        invalidate('titles', 'genres')
+
+
+def category_changed(sender, instance, **kwargs):
+    invalidate('categories')
+
+
+def genre_changed(sender, instance, **kwargs):
+    invalidate('genres')
+
+
+def review_saved(sender, instance, **kwargs):
+    # Отзыв меняет рейтинг: сбрасываем и произведение
+    invalidate(
+        resource_group('reviews', instance.title_id), 'titles',
+        resource_group('title', instance.title_id)
+    )
+
+
+def review_deleted(sender, instance, **kwargs):
+    invalidate(
+        resource_group('reviews', instance.title_id), 'titles',
+        resource_group('title', instance.title_id),
+        resource_group('comments', instance.pk)
+    )
+
+
+def comment_changed(sender, instance, **kwargs):
+    invalidate(resource_group('comments', instance.review_id))
+
+
+def author_groups(user_ids):
+    """Группы отзывов и комментариев, в которых выводится имя авторов."""
+    title_ids = Review.objects.filter(
+        author__in=user_ids
+    ).values_list('title_id', flat=True).distinct()
+    review_ids = Comment.objects.filter(
+        author__in=user_ids
+    ).values_list('review_id', flat=True).distinct()
+    return (
+        *(resource_group('reviews', pk) for pk in title_ids),
+        *(resource_group('comments', pk) for pk in review_ids),
+    )
+
+
+def user_saved(sender, instance, raw=False, **kwargs):
+    if not raw and instance.username_changed:
+        invalidate(*author_groups([instance.pk]))
+
+
+def users_bulk_updated(sender, pks, fields, **kwargs):
+    if 'username' in fields:
+        invalidate(*author_groups(pks))
+
+
+def connect_signals():
+    post_save.connect(title_saved, sender=Title)
+    post_delete.connect(title_deleted, sender=Title)
+    post_save.connect(genre_title_saved, sender=GenreTitle)
+    post_delete.connect(genre_title_saved, sender=GenreTitle)
+    m2m_changed.connect(title_genres_changed, sender=Title.genre.through)
+    for model, receiver in ((Category, category_changed),
+                            (Genre, genre_changed),
+                            (Comment, comment_changed)):
+        post_save.connect(receiver, sender=model)
+        post_delete.connect(receiver, sender=model)
+    post_save.connect(review_saved, sender=Review)
+    post_delete.connect(review_deleted, sender=Review)
+    post_save.connect(user_saved, sender=User)
+    users_updated.connect(users_bulk_updated, sender=User)
@@ -0,0 +1,60 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 на If-None-Match/If-Modified-Since до сериализации.
+    get_version_stamp() возвращает дешевый отпечаток данных ответа
+    и дату последнего изменения (или None, если ответа не будет).
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def get_version_stamp(self):
+        raise NotImplementedError
+
+    def get_etag(self, stamp):
+        # Отпечаток зависит и от query string (страница, фильтры),
+        # и от формата ответа (JSON или browsable API)
+        raw = '|'.join((
+            str(stamp), self.request.get_full_path(),
+            self.request.accepted_renderer.format,
+        ))
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        version = self.get_version_stamp()
+        if version is None:
+            return handler(request, *args, **kwargs)
+        stamp, last_modified = version
+        etag = self.get_etag(stamp)
+        # HTTP-даты с точностью до секунды
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if 'list' not in self.conditional_actions:
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'retrieve' not in self.conditional_actions:
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -1,23 +1,78 @@
 import django_filters
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
 
-from reviews.models import Title
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.search import search_titles
+
+
+def split_slugs(value):
+    return {slug.strip() for slug in value.split(',') if slug.strip()}
 
 
 class TitleFilter(django_filters.FilterSet):
     """
     Кастомный фильтр для вьюсета 'Title'.
+    'category' и 'genre' по умолчанию ищут подстроку в slug.
+    С 'slug_match=exact' они принимают точный slug или список
+    через запятую; тогда 'genre_match=all' требует все перечисленные
+    жанры, по умолчанию достаточно любого.
     """
     name = django_filters.CharFilter(lookup_expr='icontains')
     year = django_filters.NumberFilter(lookup_expr='iexact')
-    category = django_filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
+    category = django_filters.CharFilter(method='filter_category')
+    genre = django_filters.CharFilter(method='filter_genre')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'category', 'genre')
+        fields = ('name', 'year', 'category', 'genre', 'search')
+
+    @property
+    def match_contains(self):
+        slug_match = self.data.get('slug_match', 'contains')
+        if slug_match not in ('contains', 'exact'):
+            raise ValidationError(
+                {'slug_match': 'Допустимые значения: contains, exact.'}
+            )
+        return slug_match == 'contains'
+
+    def filter_category(self, queryset, name, value):
+        if self.match_contains:
+            return queryset.filter(category__slug__icontains=value)
+        # slug -> id одним запросом, дальше фильтр по индексу category_id
+        category_ids = list(Category.objects.filter(
+            slug__in=split_slugs(value)
+        ).values_list('id', flat=True))
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Отбирает произведения подзапросом 'id IN (...)' по GenreTitle,
+        поэтому строки не размножаются join'ом и distinct не нужен.
+        Для 'genre_match=all' пересечение множеств считается
+        одной группировкой по title_id.
+        """
+        match_all = self.data.get('genre_match') == 'all'
+        if match_all and self.match_contains:
+            raise ValidationError({
+                'genre_match': 'genre_match=all требует slug_match=exact.'
+            })
+        genres = Genre.objects.all()
+        if self.match_contains:
+            genres = genres.filter(slug__icontains=value)
+        else:
+            genres = genres.filter(slug__in=split_slugs(value))
+        genre_ids = list(genres.values_list('id', flat=True))
+        links = GenreTitle.objects.filter(genre_id__in=genre_ids).order_by()
+        if match_all:
+            if len(genre_ids) < len(split_slugs(value)):
+                return queryset.none()
+            links = links.values('title_id').annotate(
+                genres_count=Count('genre_id', distinct=True)
+            ).filter(genres_count=len(genre_ids))
+        return queryset.filter(id__in=links.values('title_id'))
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию с ранжированием."""
+        return search_titles(queryset, value)
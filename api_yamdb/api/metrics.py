@@ -0,0 +1,253 @@
+import bisect
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Q
+from django.http import HttpResponse, HttpResponseForbidden
+
+from reviews.models import OutboxEmail
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000)
+
+# Имя -> (тип, описание, границы корзин гистограммы)
+METRICS = {
+    'http_requests_total': (
+        'counter', 'HTTP requests by route, method and status', None
+    ),
+    'http_request_duration_seconds': (
+        'histogram', 'HTTP request latency by route', DURATION_BUCKETS
+    ),
+    'http_response_size_bytes': (
+        'histogram', 'HTTP response body size by route', SIZE_BUCKETS
+    ),
+    'db_queries_total': (
+        'counter', 'ORM queries executed by route', None
+    ),
+    'api_cache_requests_total': (
+        'counter', 'API response cache lookups by result', None
+    ),
+}
+
+
+class Registry:
+    """
+    Метрики процесса. Счетчик хранит число, гистограмма - список
+    [количество по корзинам..., +Inf, сумма]. В многопроцессном режиме
+    (METRICS_DIR) процесс сбрасывает свои метрики в отдельный файл
+    каталога, а /metrics складывает файлы всех процессов.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Отдельная блокировка: flush() берет self.lock в snapshot()
+        self.flush_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.values = {}
+            self.last_flush = 0
+            # После fork у процесса свой файл и свои метрики
+            self.pid = os.getpid()
+            self.file_name = f'{self.pid}-{uuid.uuid4().hex[:8]}.json'
+
+    def check_pid(self):
+        if self.pid != os.getpid():
+            self.reset()
+
+    def inc(self, name, labels, value=1):
+        self.check_pid()
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        self.check_pid()
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if key not in self.values:
+                self.values[key] = [0] * (len(buckets) + 2)
+            sample = self.values[key]
+            sample[bisect.bisect_left(buckets, value)] += 1
+            sample[-1] += value
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                [name, dict(labels), value]
+                for (name, labels), value in self.values.items()
+            ]
+
+    def flush(self, force=False):
+        """Атомарно записывает метрики процесса в METRICS_DIR."""
+        metrics_dir = settings.METRICS_DIR
+        if not metrics_dir:
+            return
+        # Потоки процесса пишут один и тот же временный файл
+        with self.flush_lock:
+            now = time.monotonic()
+            if (not force and now - self.last_flush
+                    < settings.METRICS_FLUSH_INTERVAL):
+                return
+            self.check_pid()
+            self.last_flush = now
+            path = os.path.join(metrics_dir, self.file_name)
+            with open(f'{path}.tmp', 'w') as out:
+                json.dump(self.snapshot(), out)
+            os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """Метрики всех процессов, сложенные по имени и меткам."""
+        if not settings.METRICS_DIR:
+            return self.snapshot()
+        self.flush(force=True)
+        totals = {}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+            with open(path) as source:
+                samples = json.load(source)
+            for name, labels, value in samples:
+                key = (name, tuple(sorted(labels.items())))
+                if isinstance(value, list):
+                    total = totals.setdefault(key, [0] * len(value))
+                    totals[key] = [a + b for a, b in zip(total, value)]
+                else:
+                    totals[key] = totals.get(key, 0) + value
+        return [
+            [name, dict(labels), value]
+            for (name, labels), value in totals.items()
+        ]
+
+
+registry = Registry()
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"')
+         .replace('\n', r'\n'))
+        for name, value in sorted(labels.items())
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def render(samples, gauges):
+    """Текстовый формат экспозиции Prometheus 0.0.4."""
+    by_name = defaultdict(list)
+    for name, labels, value in samples:
+        by_name[name].append((labels, value))
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for labels, value in sorted(
+                by_name[name], key=lambda sample: sorted(sample[0].items())):
+            if kind == 'counter':
+                lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), value[:-1]):
+                cumulative += count
+                bucket_labels = format_labels({**labels, 'le': str(bound)})
+                lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {value[-1]}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    for name, (help_text, value) in gauges.items():
+        lines += [
+            f'# HELP {name} {help_text}', f'# TYPE {name} gauge',
+            f'{name} {value}',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_allowed(request):
+    """Токен METRICS_TOKEN или адрес из METRICS_ALLOWED_IPS, если задан."""
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    token = settings.METRICS_TOKEN
+    return bool(token) and hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    )
+
+
+def metrics_view(request):
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    # Считается при каждом опросе, поэтому верно для всех процессов
+    outbox = OutboxEmail.objects.filter(sent__isnull=True).aggregate(
+        pending=Count(
+            'pk', filter=Q(attempts__lt=settings.OUTBOX_MAX_ATTEMPTS)
+        ),
+        dead=Count(
+            'pk', filter=Q(attempts__gte=settings.OUTBOX_MAX_ATTEMPTS)
+        ),
+    )
+    gauges = {
+        'email_outbox_pending': (
+            'Emails waiting in the outbox to be sent or retried',
+            outbox['pending']
+        ),
+        'email_outbox_dead': (
+            'Emails that failed OUTBOX_MAX_ATTEMPTS times and will not be '
+            'retried',
+            outbox['dead']
+        ),
+    }
+    return HttpResponse(
+        render(registry.collect(), gauges),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def get_route(request):
+    """Имя маршрута: 'titles-list', 'reviews-detail' и т.п."""
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unmatched'
+
+
+class MetricsMiddleware:
+    """Считает запросы, время, размер ответа и число SQL по маршрутам."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        route = get_route(request)
+        labels = {'route': route, 'method': request.method}
+        registry.inc('http_requests_total', {
+            **labels, 'status': str(response.status_code)
+        })
+        registry.observe('http_request_duration_seconds', labels, duration)
+        if not response.streaming:
+            registry.observe(
+                'http_response_size_bytes', labels, len(response.content)
+            )
+        registry.inc('db_queries_total', {'route': route}, queries)
+        registry.flush()
+        return response
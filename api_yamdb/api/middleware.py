@@ -0,0 +1,100 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('api.queries')
+
+
+class QueryStats:
+    """
+    Обертка выполнения запросов (connection.execute_wrapper):
+    считает запросы, их суммарное время, самый медленный
+    и повторы одного и того же SQL, признак N+1.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = ''
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            self.statements[sql] += 1
+            if duration >= self.slowest_duration:
+                self.slowest_duration = duration
+                self.slowest_sql = sql
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.statements.values())
+
+    def most_repeated(self):
+        sql, count = (self.statements.most_common(1) or [('', 0)])[0]
+        return sql, count
+
+
+class QueryStatsMiddleware:
+    """
+    Для доли запросов QUERY_STATS_SAMPLE_RATE собирает QueryStats
+    по всем базам и пишет их строкой JSON в лог 'api.queries'.
+    Заголовок Server-Timing раскрывает устройство запросов к БД,
+    поэтому его получают администраторы или все при
+    QUERY_STATS_SERVER_TIMING.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.QUERY_STATS_SAMPLE_RATE:
+            return self.get_response(request)
+
+        stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        if self.show_server_timing(request):
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={stats.duration * 1000:.2f};'
+                f'desc="{stats.count} queries, '
+                f'{stats.duplicates} duplicates"',
+                f'db-slowest;dur={stats.slowest_duration * 1000:.2f}',
+                f'total;dur={total * 1000:.2f}',
+            ))
+        repeated_sql, repeated_count = stats.most_repeated()
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 2),
+            'queries': stats.count,
+            'sql_ms': round(stats.duration * 1000, 2),
+            'slowest_ms': round(stats.slowest_duration * 1000, 2),
+            'slowest_sql': stats.slowest_sql[:500],
+            'duplicates': stats.duplicates,
+            'most_repeated_count': repeated_count,
+            'most_repeated_sql': repeated_sql[:500],
+        }, ensure_ascii=False))
+        return response
+
+    def show_server_timing(self, request):
+        # DRF кладет пользователя из токена в request после аутентификации
+        return settings.QUERY_STATS_SERVER_TIMING or getattr(
+            getattr(request, 'user', None), 'is_admin_or_superuser', False
+        )
@@ -0,0 +1,58 @@
+from rest_framework import pagination
+
+
+class CursorOptInPagination(pagination.BasePagination):
+    """
+    По умолчанию - постраничная пагинация (page/count).
+    Клиент может переключиться на курсорную пагинацию без OFFSET и COUNT(*),
+    передав '?pagination=cursor'; ссылки next/previous содержат 'cursor'.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    ordering = '-id'
+
+    def __init__(self):
+        self.paginator = None
+
+    def is_cursor_mode(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == self.cursor_mode
+            or pagination.CursorPagination.cursor_query_param in params
+        )
+
+    def get_paginator(self, request):
+        if self.is_cursor_mode(request):
+            paginator = pagination.CursorPagination()
+            paginator.ordering = self.ordering
+            return paginator
+        return pagination.PageNumberPagination()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_fields(self, view):
+        return (
+            pagination.PageNumberPagination().get_schema_fields(view)
+            + pagination.CursorPagination().get_schema_fields(view)
+        )
+
+
+class TitlePagination(CursorOptInPagination):
+    ordering = '-id'
+
+
+class PubDatePagination(CursorOptInPagination):
+    """Для отзывов и комментариев: id разрешает совпадения 'pub_date'."""
+    ordering = ('-pub_date', '-id')
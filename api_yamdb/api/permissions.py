@@ -34,6 +34,6 @@ class IsAuthorOrStaffOrReadOnly(permissions.BasePermission):
     """Доступ на изменение автору, админу, модератору"""
     def has_object_permission(self, request, view, obj):
         return (request.method in permissions.SAFE_METHODS
-                or obj.author == request.user
+                or obj.author_id == request.user.id
                 or request.user.is_admin_or_superuser
                 or request.user.is_moderator)
@@ -0,0 +1,77 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import relations, serializers
+
+
+def _unwrap(field):
+    """Возвращает дочернее поле для полей с many=True."""
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, relations.ManyRelatedField):
+        return field.child_relation
+    return field
+
+
+def _collect(serializer, model, prefix=''):
+    """
+    Обходит поля сериализатора и собирает связи модели,
+    которые он читает: FK/O2O - в select_related,
+    M2M и обратные FK - в prefetch_related.
+    """
+    select, prefetch = [], []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+        lookup = prefix + field.source
+        child = _unwrap(field)
+        related_model = model_field.related_model
+        if model_field.many_to_many or model_field.one_to_many:
+            queryset = related_model._default_manager.all()
+            if isinstance(child, serializers.ModelSerializer):
+                queryset = _optimize(queryset, child)
+            prefetch.append(Prefetch(lookup, queryset=queryset))
+            continue
+        select.append(lookup)
+        if isinstance(child, serializers.ModelSerializer):
+            nested_select, nested_prefetch = _collect(
+                child, related_model, prefix=lookup + '__'
+            )
+            select.extend(nested_select)
+            prefetch.extend(nested_prefetch)
+    return select, prefetch
+
+
+def _apply(queryset, select, prefetch):
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+def _optimize(queryset, serializer):
+    return _apply(queryset, *_collect(serializer, queryset.model))
+
+
+@lru_cache(maxsize=None)
+def get_related_lookups(serializer_class, model):
+    """Кэширует разбор сериализатора: поля класса не меняются."""
+    return _collect(serializer_class(), model)
+
+
+def optimize_queryset(queryset, serializer_class):
+    """
+    Добавляет к queryset join'ы и prefetch'и для всех связей,
+    которые читает 'serializer_class', чтобы избежать N+1 запросов.
+    """
+    return _apply(
+        queryset, *get_related_lookups(serializer_class, queryset.model)
+    )
@@ -0,0 +1,68 @@
+import random
+import threading
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import get_cache, recently_changed
+
+# Реплика, выбранная для текущего запроса этого потока
+_local = threading.local()
+
+
+def pin_key(user_id):
+    return f'replica:pin:{user_id}'
+
+
+class ReplicaRouter:
+    """
+    Читает из реплики, которую ReplicaReadMixin выбрал на время запроса,
+    пишет в основную базу. После первой записи запрос до конца
+    читает из основной базы.
+    """
+    def db_for_read(self, model, **hints):
+        return getattr(_local, 'replica', None)
+
+    def db_for_write(self, model, **hints):
+        _local.replica = None
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # В репликах те же данные, что и в основной базе
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схему реплик переносит репликация
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    Направляет безопасные запросы вьюсета в случайную реплику.
+    Пользователь, недавно писавший через такой вьюсет, читает
+    из основной базы REPLICA_PIN_SECONDS секунд: реплики могут отставать,
+    а он должен видеть свои изменения. Столько же после сброса группы
+    кэша из get_cache_groups() ее читают из основной базы все, иначе
+    устаревший ответ реплики попал бы в кэш под новой версией группы.
+    """
+    def initial(self, request, *args, **kwargs):
+        _local.replica = None
+        super().initial(request, *args, **kwargs)
+        if (settings.DATABASE_REPLICAS and request.method in SAFE_METHODS
+                and not self.pinned_to_primary(request.user)
+                and not recently_changed(self.get_cache_groups())):
+            _local.replica = random.choice(settings.DATABASE_REPLICAS)
+
+    def pinned_to_primary(self, user):
+        return (user.is_authenticated
+                and get_cache().get(pin_key(user.pk)) is not None)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        _local.replica = None
+        if (settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS
+                and request.user.is_authenticated):
+            get_cache().set(
+                pin_key(request.user.pk), True,
+                timeout=settings.REPLICA_PIN_SECONDS
+            )
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,13 +1,18 @@
 import datetime as dt
 
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnList
 from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
+from .authentication import add_user_claims
 
 User = get_user_model()
 
@@ -91,7 +96,9 @@ class TitleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = (
+            'rating', 'review_count', 'score_sum', 'version', 'modified'
+        )
         validators = [
             UniqueTogetherValidator(
                 queryset=Title.objects.all(),
@@ -184,6 +191,11 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         self.fields['confirmation_code'] = serializers.CharField()
         del self.fields['password']  # Вместо пароля confirmation_code
 
+    @classmethod
+    def get_token(cls, user):
+        # Роль в токене: права проверяются без запроса пользователя
+        return add_user_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         user = get_object_or_404(User, username=attrs['username'])
         refresh = self.get_token(user)
@@ -207,19 +219,27 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date',)
 
     def validate(self, data):
-        author = self.context.get('request').user
-        title_id = get_object_or_404(
-            Title,
-            id=self.context.get('view').kwargs.get('title_id')
-        )
-        if (self.context.get('request').method == 'POST'
-            and Review.objects.filter(
-                title_id=title_id,
-                author_id=author.id).exists()):
-            raise serializers.ValidationError(
-                'Возможно оставить только один отзыв')
+        self.context.get('view').get_title()
         return data
 
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение 'unique_review'
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            # Остальные нарушения целостности - не ошибка клиента
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author']
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Возможно оставить только один отзыв'
+                ]
+            })
+
 
 class CommentSerializer(serializers.ModelSerializer):
     """
@@ -236,9 +256,112 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date',)
 
     def validate(self, data):
-        get_object_or_404(
-            Review,
-            id=self.context.get('view').kwargs.get('review_id'),
-            title_id=self.context.get('view').kwargs.get('title_id')
-        )
+        self.context.get('view').get_review()
         return data
+
+
+class ValuesListSerializer(serializers.BaseSerializer):
+    """
+    Сериализатор списков только на чтение: словари строятся прямо
+    из строк queryset.values() без полей DRF и вложенных сериализаторов.
+    Вывод совпадает с выводом обычного сериализатора списка.
+    """
+    values_fields = ()
+    datetime_field = serializers.DateTimeField()
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        # Весь список обрабатывается одним экземпляром
+        return cls(*args, **kwargs)
+
+    @classmethod
+    def get_values(cls, queryset):
+        return queryset.select_related(None).prefetch_related(None).values(
+            *cls.values_fields
+        )
+
+    def prepare(self, rows):
+        """Общие для всего списка данные, например связи M2M."""
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        self.prepare(rows)
+        return [self.to_item(row) for row in rows]
+
+    def to_item(self, row):
+        raise NotImplementedError
+
+    def format_datetime(self, value):
+        return self.datetime_field.to_representation(value)
+
+    @property
+    def data(self):
+        return ReturnList(super().data, serializer=self)
+
+
+def get_genre_map(title_ids):
+    """
+    Жанры произведений одним запросом: id произведения -> список
+    {'name', 'slug'} в порядке prefetch_related (по убыванию id жанра).
+    """
+    genres = {}
+    if not title_ids:
+        return genres
+    links = GenreTitle.objects.filter(title_id__in=title_ids).order_by(
+        '-genre_id'
+    ).values_list('title_id', 'genre__name', 'genre__slug')
+    for title_id, name, slug in links:
+        genres.setdefault(title_id, []).append({'name': name, 'slug': slug})
+    return genres
+
+
+class TitleValuesSerializer(ValuesListSerializer):
+    """Список произведений в формате 'TitleDisplaySerializer'."""
+    values_fields = (
+        'id', 'name', 'year', 'rating', 'description',
+        'category__name', 'category__slug',
+    )
+
+    def prepare(self, rows):
+        self.genres = get_genre_map([row['id'] for row in rows])
+
+    def to_item(self, row):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': row['rating'],
+            'description': row['description'],
+            'genre': self.genres.get(row['id'], []),
+            'category': None if row['category__slug'] is None else {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            },
+        }
+
+
+class ReviewValuesSerializer(ValuesListSerializer):
+    """Список отзывов в формате 'ReviewSerializer'."""
+    values_fields = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    def to_item(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': self.format_datetime(row['pub_date']),
+        }
+
+
+class CommentValuesSerializer(ValuesListSerializer):
+    """Список комментариев в формате 'CommentSerializer'."""
+    values_fields = ('id', 'text', 'author__username', 'pub_date')
+
+    def to_item(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': self.format_datetime(row['pub_date']),
+        }
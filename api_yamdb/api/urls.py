@@ -23,13 +23,17 @@ router.register(
 
 urlpatterns = [
     path('v1/', include(router.urls)),
-    path('v1/auth/signup/', send_token),
+    path('v1/auth/signup/', send_token, name='signup'),
     path(
         'v1/auth/token/',
         MyTokenObtainPairView.as_view(),
         name='token_obtain_pair'
     ),
-    path('v1/users/', UserList.as_view()),
-    path('v1/users/me/', UserSelfDetail.as_view()),
-    re_path(r'v1/users/(?P<username>[\w.@+-]+)/$', UserDetail.as_view()),
+    path('v1/users/', UserList.as_view(), name='user-list'),
+    path('v1/users/me/', UserSelfDetail.as_view(), name='user-me'),
+    re_path(
+        r'v1/users/(?P<username>[\w.@+-]+)/$',
+        UserDetail.as_view(),
+        name='user-detail'
+    ),
 ]
@@ -1,9 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.db.models import Max
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
 
 from rest_framework import filters, generics, permissions, status, viewsets
 from rest_framework.decorators import api_view, permission_classes
@@ -11,36 +10,55 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from api_yamdb.settings import EMAIL_HOST_USER
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import Category, Genre, ListVersion, Title
+from reviews.outbox import enqueue_email
+from reviews.ratings import TITLE_LIST
+from .cache import CachedListMixin, CachedReadMixin, resource_group
+from .conditional import ConditionalGetMixin
 from .filters import TitleFilter
+from .pagination import PubDatePagination, TitlePagination
 from .permissions import IsAdmin, IsAdminOrReadOnly, IsAuthorOrStaffOrReadOnly
+from .replicas import ReplicaReadMixin
 from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, MyTokenObtainPairSerializer,
-                          ReviewSerializer, SignUpSerializer,
+                          CommentValuesSerializer, GenreSerializer,
+                          MyTokenObtainPairSerializer, ReviewSerializer,
+                          ReviewValuesSerializer, SignUpSerializer,
                           TitleDisplaySerializer, TitleSerializer,
-                          UserSerializer)
-from .viewsets import CreateListDeleteViewSet
+                          TitleValuesSerializer, UserSerializer)
+from .viewsets import (CreateListDeleteViewSet, NestedParentMixin,
+                       SerializerOptimizedQuerysetMixin, ValuesListMixin)
 
 User = get_user_model()
 
 
-class CategoryViewSet(CreateListDeleteViewSet):
+class CategoryViewSet(ReplicaReadMixin, CachedListMixin,
+                      CreateListDeleteViewSet):
     """Обработка запросов к категориям."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    def get_cache_groups(self):
+        return ('categories',)
 
-class GenreViewSet(CreateListDeleteViewSet):
+
+class GenreViewSet(ReplicaReadMixin, CachedListMixin,
+                   CreateListDeleteViewSet):
     """Обработка запросов к жанрам."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
+    def get_cache_groups(self):
+        return ('genres',)
+
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedReadMixin,
+                   ValuesListMixin, SerializerOptimizedQuerysetMixin,
+                   viewsets.ModelViewSet):
     """Обработка запросов к произведениям."""
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('-id')
+    queryset = Title.objects.order_by('-id')
+    values_serializer_class = TitleValuesSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = TitlePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
 
@@ -49,6 +67,28 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleDisplaySerializer
         return TitleSerializer
 
+    def get_cache_groups(self):
+        if self.action == 'retrieve':
+            return (
+                resource_group('title', self.kwargs['pk']),
+                'categories', 'genres'
+            )
+        return ('titles', 'categories', 'genres')
+
+    def get_version_stamp(self):
+        if self.action == 'retrieve':
+            # Нечисловой pk: ответ 404 отдаст get_object
+            if not str(self.kwargs['pk']).isdigit():
+                return None
+            return Title.objects.filter(
+                pk=self.kwargs['pk']
+            ).values_list('version', 'modified').first()
+        # Версию списка увеличивает любое изменение произведений,
+        # страница и фильтры входят в ETag через query string
+        return ListVersion.objects.filter(
+            name=TITLE_LIST
+        ).values_list('version', 'modified').first()
+
 
 class UserList(generics.ListCreateAPIView):
     """Обработка запросов к пользователям."""
@@ -140,67 +180,73 @@ def send_token(request):
         username=serializer.data['username'],
         email=serializer.data['email'],
     )
-    # Отправим письмо с кодом подтверждения
+    # Письмо с кодом подтверждения отправит команда sendoutbox
     confirmation_code = default_token_generator.make_token(user_obj)
-    send_mail(
+    enqueue_email(
         'Подтверждение регистрации пользователя',
         f'Код подтверждения: {confirmation_code}',
         EMAIL_HOST_USER,
         [serializer.data['email']],
-        fail_silently=False,
     )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedReadMixin,
+                    ValuesListMixin, NestedParentMixin, viewsets.ModelViewSet):
     """Обработка запросов к отзывам"""
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
+    pagination_class = PubDatePagination
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrStaffOrReadOnly,
     )
+    conditional_actions = ('list',)
 
     def get_queryset(self, **kwargs):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id',)
-        )
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author')
+
+    def get_cache_groups(self):
+        return (resource_group('reviews', self.kwargs['title_id']),)
+
+    def get_version_stamp(self):
+        stamp = Title.objects.filter(
+            pk=self.kwargs['title_id']
+        ).annotate(
+            last_review=Max('reviews__pub_date')
+        ).values_list(
+            'version', 'review_count', 'last_review', 'modified'
+        ).first()
+        if stamp is None:
+            return None
+        return stamp, stamp[-1]
 
     def perform_create(self, serializer, **kwargs):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id',)
-        )
         serializer.save(
             author=self.request.user,
-            title=title
+            title=self.get_title()
         )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, CachedReadMixin, ValuesListMixin,
+                     NestedParentMixin, viewsets.ModelViewSet):
     """Обработка запросов к комментариям на произведения"""
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
+    pagination_class = PubDatePagination
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrStaffOrReadOnly,
     )
 
     def get_queryset(self, **kwargs):
-        review = get_object_or_404(
-            Review,
-            title__id=self.kwargs.get('title_id'),
-            id=self.kwargs.get('review_id',)
-        )
-        return review.comment.all()
+        return self.get_review().comment.select_related('author')
+
+    def get_cache_groups(self):
+        return (resource_group('comments', self.kwargs['review_id']),)
 
     def perform_create(self, serializer, **kwargs):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id')
-        )
         serializer.save(
             author=self.request.user,
-            review=review
+            review=self.get_review()
         )
@@ -1,6 +1,9 @@
+from django.shortcuts import get_object_or_404
 from rest_framework import mixins, viewsets, filters
 
+from reviews.models import Review, Title
 from .permissions import IsAdminOrReadOnly
+from .querysets import optimize_queryset
 
 
 class CreateListDeleteViewSet(
@@ -16,3 +19,68 @@ class CreateListDeleteViewSet(
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     pass
+
+
+class SerializerOptimizedQuerysetMixin:
+    """
+    Подгружает связи, которые читает сериализатор вьюсета,
+    через select_related/prefetch_related.
+    """
+    def get_queryset(self):
+        return optimize_queryset(
+            super().get_queryset(), self.get_serializer_class()
+        )
+
+
+class ValuesListMixin:
+    """
+    Отдает GET-списки через 'values_serializer_class': страница читается
+    как queryset.values() и сериализуется без полей DRF.
+    values_serializer_class = None возвращает обычный сериализатор.
+    """
+    values_serializer_class = None
+
+    def use_values_serializer(self):
+        # Формы browsable API и OPTIONS клонируют запрос с другим методом
+        return (
+            self.values_serializer_class is not None
+            and self.action == 'list'
+            and self.request.method in ('GET', 'HEAD')
+        )
+
+    def paginate_queryset(self, queryset):
+        if self.use_values_serializer():
+            queryset = self.values_serializer_class.get_values(queryset)
+        return super().paginate_queryset(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        if not self.use_values_serializer():
+            return super().get_serializer(*args, **kwargs)
+        kwargs['context'] = self.get_serializer_context()
+        return self.values_serializer_class(*args, **kwargs)
+
+
+class NestedParentMixin:
+    """
+    Находит родительские объекты вложенных маршрутов
+    ('title_id', 'review_id') один раз за запрос.
+    Вьюсет, сериализатор (через context['view']) и пермишены
+    получают их методами get_title()/get_review().
+    """
+    def get_title(self):
+        if not hasattr(self, '_parent_title'):
+            self._parent_title = get_object_or_404(
+                Title,
+                id=self.kwargs.get('title_id')
+            )
+        return self._parent_title
+
+    def get_review(self):
+        if not hasattr(self, '_parent_review'):
+            self._parent_review = get_object_or_404(
+                Review.objects.select_related('title'),
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+            self._parent_title = self._parent_review.title
+        return self._parent_review
@@ -12,7 +12,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = os.getenv('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', 'True').lower() in ('true', '1')
 
 ALLOWED_HOSTS = ['*']
 
@@ -33,6 +33,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.middleware.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -42,6 +44,36 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Доля запросов, для которых считается статистика SQL (0..1)
+QUERY_STATS_SAMPLE_RATE = float(os.getenv('QUERY_STATS_SAMPLE_RATE', 0.01))
+# Server-Timing получают все, только если DEBUG явно включен в окружении,
+# иначе только администраторы
+QUERY_STATS_SERVER_TIMING = os.getenv('DEBUG', '').lower() in ('true', '1')
+
+# Каталог для метрик нескольких процессов (gunicorn workers): каждый
+# процесс пишет свой файл не чаще раза в METRICS_FLUSH_INTERVAL секунд,
+# /metrics складывает все файлы. Каталог очищают перед запуском.
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1))
+# /metrics доступен с заголовком Authorization: Bearer <METRICS_TOKEN>;
+# без токена закрыт. METRICS_ALLOWED_IPS (через запятую) открывает его
+# по REMOTE_ADDR: за прокси на том же хосте это 127.0.0.1 у всех клиентов
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+METRICS_ALLOWED_IPS = list(
+    filter(None, os.getenv('METRICS_ALLOWED_IPS', '').split(','))
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.queries': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -66,13 +98,81 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
+# Профили настроек SQLite, выбираются переменной DATABASE_PROFILE.
+# 'tuned' для продакшена: WAL (чтение не ждет записи), synchronous=NORMAL
+# (fsync только при checkpoint), ожидание блокировки вместо
+# 'database is locked', кэш страниц 64 МиБ, mmap 256 МиБ
+# и постоянные соединения. PRAGMAS выполняются на каждом соединении.
+DATABASE_PROFILES = {
+    'default': {},
+    'tuned': {
+        'CONN_MAX_AGE': 600,
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'cache_size': -64000,
+            'mmap_size': 268435456,
+        },
+    },
+}
+DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'default')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.getenv(
+            'DATABASE_NAME', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        **DATABASE_PROFILES[DATABASE_PROFILE],
     }
 }
 
+# Реплики для чтения: пути к файлам SQLite через запятую. Локально
+# подойдет копия базы или та же база только на чтение:
+# DATABASE_REPLICA_NAMES=file:db.sqlite3?mode=ro
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+        filter(None, os.getenv('DATABASE_REPLICA_NAMES', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+# Сколько секунд после записи пользователь читает из основной базы
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+
+# Cache
+# Кэш ответов API: бэкенд меняется переменными окружения, например
+# FileBasedCache с каталогом в API_CACHE_LOCATION или Redis-совместимый
+# сервер через django_redis.cache.RedisCache. Для нескольких процессов
+# нужен общий бэкенд, иначе сброс по сигналам виден только своему процессу.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.getenv(
+            'API_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('API_CACHE_LOCATION', 'api-responses'),
+        'TIMEOUT': int(os.getenv('API_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('API_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
+
+API_CACHE_ALIAS = 'api'
+API_CACHE_ENABLED = os.getenv('API_CACHE_ENABLED', 'True') == 'True'
+
 
 # Password validation
 
@@ -117,17 +217,32 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+
+    # orjson, если установлен; HTML-версия API только при DEBUG
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7)
 }
 
+# Сколько секунд кэш API хранит состояние пользователя из БД: дольше этого
+# другие процессы с локальным кэшем не видят изменения пользователя
+AUTH_USER_STATE_TTL = int(os.getenv('AUTH_USER_STATE_TTL', 60))
+
 AUTH_USER_MODEL = 'reviews.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -136,3 +251,5 @@ EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_PORT = 587
+# После стольких неудачных попыток письмо остается в очереди неотправленным
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, GenreTitle, Review, Title, User
+from .models import (Category, Comment, Genre, GenreTitle, OutboxEmail, Review,
+                     Title, User)
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -72,6 +73,20 @@ class CommentAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'subject',
+        'to',
+        'attempts',
+        'next_attempt',
+        'sent',
+        'last_error',
+    )
+    search_fields = ('to',)
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(User, UserAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(Category, CategoryAdmin)
@@ -79,3 +94,4 @@ admin.site.register(Genre, GenreAdmin)
 admin.site.register(GenreTitle)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import create_search_index
+        from .pragmas import apply_pragmas
+        from .ratings import create_list_versions
+        post_migrate.connect(create_search_index, sender=self)
+        post_migrate.connect(create_list_versions, sender=self)
+        connection_created.connect(apply_pragmas)
@@ -0,0 +1,246 @@
+import csv
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connection, connections
+from django.utils import timezone
+
+from reviews.models import ImportCheckpoint
+
+# Имена CSV-файлов моделей, как в static/data
+DATA_FILES = {
+    'User': 'users',
+    'Category': 'category',
+    'Genre': 'genre',
+    'Title': 'titles',
+    'GenreTitle': 'genre_title',
+    'Review': 'review',
+    'Comment': 'comments',
+}
+
+
+@contextmanager
+def explicit_dates(model_cl):
+    """
+    На время загрузки отключает auto_now/auto_now_add полей модели:
+    bulk_create вызывает pre_save(add=True), который иначе заменил бы
+    даты из файла текущим временем. Возвращает функцию, заполняющую
+    текущим временем только пустые даты.
+    """
+    fields = [
+        field for field in model_cl._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+
+    def fill_missing(objs):
+        now = timezone.now()
+        for obj in objs:
+            for field in fields:
+                if getattr(obj, field.attname) in (None, ''):
+                    setattr(obj, field.attname, now)
+
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fill_missing
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class OffsetLines:
+    """
+    Отдает строки бинарного файла как текст и помнит смещение
+    в байтах конца последней прочитанной строки.
+    """
+
+    def __init__(self, binary_file):
+        self.file = binary_file
+        self.offset = binary_file.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.file.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode('utf-8')
+
+    def seek(self, offset):
+        self.file.seek(offset)
+        self.offset = offset
+
+
+def read_batches(binary_file, batch_size, start=0):
+    """
+    Построчно читает CSV и отдает пачки по 'batch_size' словарей
+    вместе со смещением конца пачки в файле: в памяти одновременно
+    находится только одна пачка. С 'start' чтение продолжается
+    с сохраненного смещения, уже загруженные строки не читаются.
+    """
+    lines = OffsetLines(binary_file)
+    reader = csv.reader(lines, delimiter=',')
+    header = next(reader, None)
+    if header is None:
+        return
+    if start:
+        lines.seek(start)
+    batch = []
+    for row in reader:
+        batch.append(dict(zip(header, row)))
+        if len(batch) >= batch_size:
+            yield batch, lines.offset
+            batch = []
+    if batch:
+        yield batch, lines.offset
+
+
+class Checkpoint:
+    """
+    Позиции последних закоммиченных пачек загрузки 'name'
+    для каждого файла в таблице ImportCheckpoint. save() вызывается
+    в транзакции пачки: позиция и строки фиксируются вместе.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def get(self, file_path):
+        return ImportCheckpoint.objects.filter(
+            name=self.name, file=os.path.abspath(file_path)
+        ).values('offset', 'rows', 'done').first() or {}
+
+    def save(self, file_path, **state):
+        ImportCheckpoint.objects.update_or_create(
+            name=self.name, file=os.path.abspath(file_path), defaults=state
+        )
+
+    def clear(self):
+        ImportCheckpoint.objects.filter(name=self.name).delete()
+
+
+class Progress:
+    """Счетчик импортированных строк и скорости загрузки."""
+
+    def __init__(self, report_every, write):
+        self.report_every = report_every
+        self.write = write
+        self.rows = 0
+        self.reported = 0
+        self.started = time.monotonic()
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed else 0.0
+
+    def add(self, rows):
+        self.rows += rows
+        due = self.rows - self.reported >= self.report_every
+        if self.report_every and due:
+            self.reported = self.rows
+            self.write(f'{self.rows} rows, {self.rate:.0f} rows/sec')
+
+
+def dependency_levels(models):
+    """
+    Раскладывает модели по уровням внешних ключей:
+    модели одного уровня не зависят друг от друга,
+    а все их FK указывают на модели предыдущих уровней.
+    """
+    pending = {
+        model: {
+            field.related_model
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    levels = []
+    while pending:
+        level = [model for model, deps in pending.items() if not deps]
+        if not level:
+            raise ValueError(
+                f'Circular foreign keys: {", ".join(map(str, pending))}'
+            )
+        levels.append(sorted(level, key=lambda model: model.__name__))
+        for model in level:
+            del pending[model]
+        for deps in pending.values():
+            deps.difference_update(level)
+    return levels
+
+
+def model_for_file(file_name, models):
+    """
+    Сопоставляет файлу модель по имени:
+    'users.csv' - User, 'genre_title.csv' - GenreTitle.
+    """
+    stem = file_name.rsplit('.', 1)[0].replace('_', '').lower()
+    for model in models:
+        if model._meta.model_name in (stem, stem[:-1]):
+            return model
+    return None
+
+
+def column_attnames(model, header):
+    """
+    Переводит заголовки CSV в attname полей модели
+    ('author' -> 'author_id'), чтобы FK задавались по id
+    без запросов к связанным таблицам.
+    Возвращает словарь колонка -> attname и множество
+    nullable-колонок, где пустая строка означает NULL.
+    """
+    attnames, nullable = {}, set()
+    for column in header:
+        field = model._meta.get_field(column)
+        attnames[column] = field.attname
+        if field.null:
+            nullable.add(column)
+    return attnames, nullable
+
+
+def reset_sequences(models):
+    """Сдвигает последовательности id за максимальные значения в таблицах."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+@contextmanager
+def use_database(settings_dict):
+    """
+    Временно направляет алиас default на другую базу.
+    Исходное соединение возвращается как есть: так не теряется
+    и база в памяти, которую закрытие соединения уничтожило бы.
+    """
+    original = connections['default']
+    connections.databases['default'] = settings_dict
+    del connections['default']
+    try:
+        yield
+    finally:
+        connections['default'].close()
+        connections.databases['default'] = original.settings_dict
+        connections['default'] = original
+
+
+def copy_database(path):
+    """Копирует текущую базу SQLite в файл через backup API."""
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        connection.connection.backup(target)
+    finally:
+        target.close()
@@ -0,0 +1,277 @@
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from api.serializers import MyTokenObtainPairSerializer
+from reviews.models import Review, Title, User, UserRole
+from ._private import copy_database, use_database
+
+# Сценарий -> вес при случайном выборе
+SCENARIOS = {
+    'browse_titles': 6,
+    'post_review': 2,
+    'comment_thread': 2,
+    'admin_user_search': 1,
+}
+PERCENTILES = (50, 95, 99)
+# Отдельный кэш: ответы копии базы не должны попасть в общий кэш API
+BENCH_CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'benchapi-{alias}',
+    }
+    for alias in ('default', 'api')
+}
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def summarize(latencies, errors):
+    summary = {
+        f'p{percent}': round(percentile(latencies, percent) * 1000, 2)
+        for percent in PERCENTILES
+    }
+    summary.update(requests=len(latencies), errors=errors)
+    return summary
+
+
+class Session:
+    """Поток нагрузки: клиент API и замеры его запросов по шагам."""
+
+    def __init__(self, data, seed):
+        self.data = data
+        self.rng = random.Random(seed)
+        self.client = APIClient()
+        self.samples = []
+
+    def request(self, step, method, path, expected, token=None, data=None):
+        """
+        Выполняет запрос шага. Ответ со статусом не из expected
+        считается ошибкой, в том числе 4xx.
+        """
+        if token:
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        else:
+            self.client.credentials()
+        started = time.perf_counter()
+        response = getattr(self.client, method)(path, data=data, format='json')
+        self.samples.append((
+            step, response.status_code not in expected,
+            time.perf_counter() - started
+        ))
+        return response
+
+    def browse_titles(self):
+        page = self.rng.randint(1, self.data['title_pages'])
+        self.request(
+            'title-list', 'get', f'/api/v1/titles/?page={page}', (200,)
+        )
+        title_id = self.rng.choice(self.data['title_ids'])
+        self.request(
+            'title-detail', 'get', f'/api/v1/titles/{title_id}/', (200,)
+        )
+        self.request(
+            'reviews-list', 'get', f'/api/v1/titles/{title_id}/reviews/',
+            (200,)
+        )
+
+    def post_review(self):
+        # Повторный отзыв на то же произведение - ожидаемый ответ 400
+        title_id = self.rng.choice(self.data['title_ids'])
+        self.request(
+            'reviews-create', 'post', f'/api/v1/titles/{title_id}/reviews/',
+            (201, 400), token=self.rng.choice(self.data['user_tokens']),
+            data={'text': 'Отзыв под нагрузкой', 'score': 7}
+        )
+
+    def comment_thread(self):
+        title_id, review_id = self.rng.choice(self.data['reviews'])
+        path = f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        token = self.rng.choice(self.data['user_tokens'])
+        self.request('comments-list', 'get', path, (200,))
+        self.request(
+            'comments-create', 'post', path, (201,), token=token,
+            data={'text': 'Комментарий под нагрузкой'}
+        )
+        self.request('comments-list', 'get', path, (200,), token=token)
+
+    def admin_user_search(self):
+        name = self.rng.choice(self.data['usernames'])[:5]
+        self.request(
+            'users-search', 'get', f'/api/v1/users/?search={name}', (200,),
+            token=self.data['admin_token']
+        )
+
+
+class Command(BaseCommand):
+    help = ('Runs weighted API scenarios in-process on a copy of the '
+            'database and reports throughput and latency percentiles')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=500,
+            help='Scenario runs in total'
+        )
+        parser.add_argument('--threads', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--save-baseline', metavar='FILE',
+            help='Write the results as a JSON baseline'
+        )
+        parser.add_argument(
+            '--baseline', metavar='FILE',
+            help='Fail if p95 or throughput regressed against this baseline'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Allowed relative regression, 0.2 means 20%%'
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'benchapi.sqlite3')
+            copy_database(path)
+            with use_database({
+                **connections['default'].settings_dict, 'NAME': path,
+            }), override_settings(
+                CACHES=BENCH_CACHES, METRICS_DIR=None,
+                QUERY_STATS_SAMPLE_RATE=0, DATABASE_REPLICAS=[]
+            ):
+                data = self.prepare()
+                started = time.perf_counter()
+                samples = self.run(data, options)
+                elapsed = time.perf_counter() - started
+
+        results = self.report(samples, elapsed)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as out:
+                json.dump(results, out, indent=2)
+        if options['baseline']:
+            with open(options['baseline']) as source:
+                baseline = json.load(source)
+            regressions = self.compare(
+                results, baseline, options['threshold']
+            )
+            if regressions:
+                raise CommandError(
+                    'Performance regressions:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('No regressions'))
+
+    def prepare(self):
+        title_ids = list(Title.objects.values_list('id', flat=True)[:1000])
+        reviews = list(
+            Review.objects.values_list('title_id', 'id')[:1000]
+        )
+        users = list(User.objects.filter(
+            role=UserRole.USER, is_superuser=False
+        )[:50])
+        if not title_ids or not reviews or not users:
+            raise CommandError(
+                'Need titles, reviews and users, load data with '
+                '"generatedata" first'
+            )
+        admin, _ = User.objects.get_or_create(
+            username='benchapi_admin', defaults={'role': UserRole.ADMIN}
+        )
+        page_size = api_settings.PAGE_SIZE
+        return {
+            'title_ids': title_ids,
+            'title_pages': -(-Title.objects.count() // page_size),
+            'reviews': reviews,
+            'usernames': [user.username for user in users],
+            'user_tokens': [self.token(user) for user in users],
+            'admin_token': self.token(admin),
+        }
+
+    def token(self, user):
+        return str(MyTokenObtainPairSerializer.get_token(user).access_token)
+
+    def run(self, data, options):
+        rng = random.Random(options['seed'])
+        names = rng.choices(
+            list(SCENARIOS), weights=list(SCENARIOS.values()),
+            k=options['iterations']
+        )
+        threads = options['threads']
+
+        def worker(number):
+            session = Session(data, f'{options["seed"]}:{number}')
+            for name in names[number::threads]:
+                getattr(session, name)()
+            connections.close_all()
+            return session.samples
+
+        if threads == 1:
+            return worker(0)
+        with ThreadPoolExecutor(threads) as executor:
+            return sum(executor.map(worker, range(threads)), [])
+
+    def report(self, samples, elapsed):
+        by_step = defaultdict(list)
+        errors = defaultdict(int)
+        for step, error, seconds in samples:
+            by_step[step].append(seconds)
+            errors[step] += error
+        results = {
+            'total': {
+                **summarize(
+                    [seconds for _, _, seconds in samples],
+                    sum(errors.values())
+                ),
+                'rps': round(len(samples) / elapsed, 1),
+            },
+            'steps': {
+                step: summarize(latencies, errors[step])
+                for step, latencies in sorted(by_step.items())
+            },
+        }
+        self.stdout.write(
+            f'{"step":<16} {"requests":>8} {"errors":>6} '
+            f'{"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}'
+        )
+        for step, summary in (
+                *results['steps'].items(), ('total', results['total'])):
+            self.stdout.write(
+                f'{step:<16} {summary["requests"]:>8} {summary["errors"]:>6} '
+                f'{summary["p50"]:>8.2f} {summary["p95"]:>8.2f} '
+                f'{summary["p99"]:>8.2f}'
+            )
+        self.stdout.write(f'{results["total"]["rps"]} req/sec')
+        return results
+
+    def compare(self, results, baseline, threshold):
+        regressions = []
+        for step, summary in (
+                ('total', baseline['total']), *baseline['steps'].items()):
+            current = (
+                results['total'] if step == 'total'
+                else results['steps'].get(step)
+            )
+            if current is None:
+                continue
+            if current['p95'] > summary['p95'] * (1 + threshold):
+                regressions.append(
+                    f'{step}: p95 {current["p95"]} ms, '
+                    f'baseline {summary["p95"]} ms'
+                )
+        rps = baseline['total'].get('rps')
+        if rps and results['total']['rps'] < rps * (1 - threshold):
+            regressions.append(
+                f'total: {results["total"]["rps"]} req/sec, '
+                f'baseline {rps} req/sec'
+            )
+        return regressions
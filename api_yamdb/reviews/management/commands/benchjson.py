@@ -0,0 +1,75 @@
+import io
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+
+def make_payload(count):
+    """Страница в формате TitleDisplaySerializer из count произведений."""
+    genres = [
+        {'name': f'Жанр {number}', 'slug': f'genre-{number}'}
+        for number in range(10)
+    ]
+    return {
+        'count': count, 'next': None, 'previous': None,
+        'results': [
+            {
+                'id': number,
+                'name': f'Произведение номер {number}',
+                'year': 1900 + number % 120,
+                'rating': (
+                    round(1 + number % 90 / 10, 1) if number % 7 else None
+                ),
+                'description': 'Описание произведения ' * 5,
+                'genre': genres[number % 10:number % 10 + 2],
+                'category': {'name': 'Книги', 'slug': 'books'},
+            }
+            for number in range(count)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = ('Compares rendering and parsing of a title list payload '
+            'with the stock DRF JSON classes and the orjson ones')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(
+                'orjson is not installed, FastJSON* fall back to the stock '
+                'classes'
+            )
+        payload = make_payload(options['titles'])
+        body = JSONRenderer().render(payload)
+        if FastJSONRenderer().render(payload) != body:
+            raise CommandError('FastJSONRenderer output differs')
+        self.stdout.write(
+            f'{options["titles"]} titles, {len(body)} bytes, '
+            f'{options["repeat"]} runs'
+        )
+        cases = (
+            ('render', JSONRenderer(), FastJSONRenderer(),
+             lambda renderer: renderer.render(payload)),
+            ('parse', JSONParser(), FastJSONParser(),
+             lambda parser: parser.parse(io.BytesIO(body))),
+        )
+        for name, stock, fast, run in cases:
+            results = [
+                min(timeit.repeat(
+                    lambda: run(instance), number=options['repeat'], repeat=3
+                )) / options['repeat'] * 1000
+                for instance in (stock, fast)
+            ]
+            self.stdout.write(
+                f'{name}: drf {results[0]:.2f} ms, '
+                f'fast {results[1]:.2f} ms, '
+                f'x{results[0] / results[1]:.1f}'
+            )
@@ -0,0 +1,118 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+from api_yamdb.asgi import WsgiToAsgi, build_environ
+from reviews.models import Review
+
+
+def make_scope(path):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http', 'method': 'GET', 'path': path,
+        'query_string': query.encode(), 'headers': [(b'host', b'localhost')],
+    }
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = ('Compares requests/sec and latency of read endpoints '
+            'served through WSGI and ASGI under the same concurrency')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Paths to request in turn, by default title list and '
+                 'detail, review list and comment list of a title'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or self.default_paths()
+        scopes = [
+            make_scope(paths[i % len(paths)])
+            for i in range(options['requests'])
+        ]
+        wsgi_application = get_wsgi_application()
+        for name, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+            # Оба прогона начинают с пустым кэшем ответов
+            for cache in caches.all():
+                cache.clear()
+            started = time.perf_counter()
+            results = run(wsgi_application, scopes, options['concurrency'])
+            elapsed = time.perf_counter() - started
+            latencies = [latency * 1000 for _, latency in results]
+            errors = sum(status != 200 for status, _ in results)
+            self.stdout.write(
+                f'{name}: {len(results) / elapsed:.0f} req/sec, '
+                f'p50 {statistics.median(latencies):.1f} ms, '
+                f'p99 {percentile(latencies, 99):.1f} ms, '
+                f'{errors} errors'
+            )
+
+    def default_paths(self):
+        review = Review.objects.order_by('id').first()
+        if review is None:
+            raise CommandError(
+                'No reviews found, load data with "generatedata" first'
+            )
+        title = f'/api/v1/titles/{review.title_id}/'
+        return [
+            '/api/v1/titles/', title, f'{title}reviews/',
+            f'{title}reviews/{review.id}/comments/',
+        ]
+
+    def run_wsgi(self, wsgi_application, scopes, concurrency):
+        """Как многопоточный WSGI-сервер: поток на запрос."""
+        def request(scope):
+            started = time.perf_counter()
+            status = []
+            result = wsgi_application(
+                build_environ(scope, b''),
+                lambda code, headers, exc_info=None: status.append(code)
+            )
+            b''.join(result)
+            result.close()
+            return int(status[0][:3]), time.perf_counter() - started
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(request, scopes))
+
+    def run_asgi(self, wsgi_application, scopes, concurrency):
+        """Как ASGI-сервер: concurrency запросов в цикле событий."""
+        application = WsgiToAsgi(wsgi_application, concurrency)
+
+        async def request(scope, semaphore):
+            messages = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                messages.append(message)
+
+            async with semaphore:
+                started = time.perf_counter()
+                await application(scope, receive, send)
+                return messages[0]['status'], time.perf_counter() - started
+
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(
+                *(request(scope, semaphore) for scope in scopes)
+            )
+
+        try:
+            return asyncio.run(main())
+        finally:
+            application.executor.shutdown()
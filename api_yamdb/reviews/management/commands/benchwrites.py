@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import RequestFactory
+
+from api.serializers import MyTokenObtainPairSerializer
+from reviews.models import Category, Title, User
+from ._private import use_database
+
+
+class Command(BaseCommand):
+    help = ('Compares review write throughput of database profiles '
+            'under concurrent API requests, each on a fresh SQLite file')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument(
+            '--writes', type=int, default=100,
+            help='Reviews posted by each thread'
+        )
+        parser.add_argument(
+            'profiles', nargs='*', default=['default', 'tuned'],
+            help='Profiles from settings.DATABASE_PROFILES'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['profiles']) - set(settings.DATABASE_PROFILES)
+        if unknown:
+            raise CommandError(f'Unknown profiles: {", ".join(unknown)}')
+        wsgi_application = get_wsgi_application()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for profile in options['profiles']:
+                with use_database({
+                    'ENGINE': connections['default'].settings_dict['ENGINE'],
+                    **settings.DATABASE_PROFILES[profile],
+                    'NAME': os.path.join(tmp_dir, f'{profile}.sqlite3'),
+                }):
+                    call_command('migrate', run_syncdb=True, verbosity=0)
+                    self.bench(profile, wsgi_application, options)
+
+    def bench(self, profile, wsgi_application, options):
+        category = Category.objects.create(name='Бенчмарк', slug='bench')
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000, category=category)
+            for i in range(options['writes'])
+        )
+        title_ids = list(Title.objects.values_list('id', flat=True))
+        tokens = [
+            str(MyTokenObtainPairSerializer.get_token(
+                User.objects.create(username=f'writer{i}')
+            ).access_token)
+            for i in range(options['threads'])
+        ]
+
+        factory = RequestFactory()
+        body = json.dumps({'text': 'Отзыв', 'score': 5})
+
+        def post_reviews(token):
+            statuses = []
+            for title_id in title_ids:
+                environ = factory.post(
+                    f'/api/v1/titles/{title_id}/reviews/', body,
+                    content_type='application/json',
+                    HTTP_AUTHORIZATION=f'Bearer {token}'
+                ).environ
+                result = wsgi_application(
+                    environ,
+                    lambda status, headers, exc_info=None:
+                        statuses.append(status)
+                )
+                result.close()
+            connections.close_all()
+            return statuses
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['threads']) as executor:
+            statuses = sum(executor.map(post_reviews, tokens), [])
+        elapsed = time.perf_counter() - started
+        created = sum(status.startswith('201') for status in statuses)
+        self.stdout.write(
+            f'{profile}: {created / elapsed:.0f} writes/sec, '
+            f'{len(statuses) - created} errors'
+        )
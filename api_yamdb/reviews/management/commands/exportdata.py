@@ -0,0 +1,116 @@
+import csv
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from ._private import DATA_FILES, Progress
+
+
+def to_csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class Command(BaseCommand):
+    help = 'Exports tables to csv or ndjson files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', type=str,
+            help='Models to export (default: all)'
+        )
+        parser.add_argument(
+            '--output-dir', type=str, default='.',
+            help='Directory for exported files'
+        )
+        parser.add_argument(
+            '--format', choices=('csv', 'ndjson'), default='csv',
+            help='Output format'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Compress output files with gzip'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Rows fetched from the database at a time'
+        )
+        parser.add_argument(
+            '--jobs', type=int, default=1,
+            help='Tables exported in parallel'
+        )
+        parser.add_argument(
+            '--progress-every', type=int, default=100000,
+            help='Report progress every N rows, 0 disables reports'
+        )
+
+    def handle(self, *args, **options):
+        names = options['models'] or list(DATA_FILES)
+        unknown = set(names) - set(DATA_FILES)
+        if unknown:
+            raise CommandError(f'Unknown models: {", ".join(sorted(unknown))}')
+        self.options = options
+        os.makedirs(options['output_dir'], exist_ok=True)
+
+        if options['jobs'] > 1:
+            with ThreadPoolExecutor(max_workers=options['jobs']) as executor:
+                list(executor.map(self.export_model_in_thread, names))
+        else:
+            for name in names:
+                self.export_model(name)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Data successfully exported'
+            )
+        )
+
+    def export_model_in_thread(self, name):
+        try:
+            self.export_model(name)
+        finally:
+            connection.close()
+
+    def export_model(self, name):
+        model_cl = apps.get_model('reviews', name)
+        columns = [field.attname for field in model_cl._meta.concrete_fields]
+        file_format = self.options['format']
+        # Имена как в static/data: выгрузка загружается через importcsv --all
+        path = os.path.join(
+            self.options['output_dir'], f'{DATA_FILES[name]}.{file_format}'
+        )
+        opener = open
+        if self.options['gzip']:
+            path, opener = f'{path}.gz', gzip.open
+        # values_list + iterator: строки читаются кусками, без кэша queryset
+        rows = model_cl.objects.order_by('pk').values_list(
+            *columns
+        ).iterator(chunk_size=self.options['chunk_size'])
+        progress = Progress(self.options['progress_every'], self.stdout.write)
+
+        with opener(path, 'wt', encoding='utf-8', newline='') as out:
+            if file_format == 'csv':
+                writer = csv.writer(out)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow(map(to_csv_value, row))
+                    progress.add(1)
+            else:
+                encoder = DjangoJSONEncoder(ensure_ascii=False)
+                for row in rows:
+                    out.write(encoder.encode(dict(zip(columns, row))))
+                    out.write('\n')
+                    progress.add(1)
+
+        self.stdout.write(
+            f'{name}: {progress.rows} rows to {path}, '
+            f'{progress.rate:.0f} rows/sec'
+        )
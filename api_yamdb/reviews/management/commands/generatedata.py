@@ -0,0 +1,267 @@
+import csv
+import datetime as dt
+import itertools
+import os
+import random
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.ratings import rebuild_ratings
+from ._private import (DATA_FILES, Progress, column_attnames, explicit_dates,
+                       reset_sequences)
+
+ROLES = ('user', 'user', 'user', 'user', 'moderator', 'admin')
+WORDS = (
+    'звезда', 'дорога', 'город', 'время', 'ночь', 'море', 'песня', 'дом',
+    'тайна', 'война', 'мир', 'любовь', 'побег', 'остров', 'лес', 'огонь',
+)
+BASE_DATE = dt.datetime(2015, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def batched(rows, size):
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def zipf_cum_weights(max_value, exponent):
+    """Накопленные веса распределения Ципфа на 1..max_value."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, max_value + 1)
+    ))
+
+
+class DatabaseSink:
+    """Пишет строки в БД пачками bulk_create, каждая в своей транзакции."""
+
+    def __init__(self, batch_size, write):
+        self.batch_size = batch_size
+        self.write = write
+
+    def id_offset(self, model_cl):
+        return model_cl.objects.aggregate(value=Max('pk'))['value'] or 0
+
+    def save(self, model_cl, columns, rows):
+        attnames, _ = column_attnames(model_cl, columns)
+        progress = Progress(0, self.write)
+        # Сгенерированные даты публикации не заменяются временем вставки
+        with explicit_dates(model_cl) as fill_dates:
+            for batch in batched(rows, self.batch_size):
+                objs = [
+                    model_cl(**{
+                        attnames[column]: value
+                        for column, value in zip(columns, row)
+                    })
+                    for row in batch
+                ]
+                fill_dates(objs)
+                with transaction.atomic():
+                    # Размер INSERT подбирает Django под лимиты SQLite
+                    model_cl.objects.bulk_create(objs)
+                progress.add(len(objs))
+        return progress
+
+
+class CsvSink:
+    """Пишет строки в CSV-файлы в формате static/data."""
+
+    def __init__(self, output_dir, write):
+        self.output_dir = output_dir
+        self.write = write
+        os.makedirs(output_dir, exist_ok=True)
+
+    def id_offset(self, model_cl):
+        return 0
+
+    def save(self, model_cl, columns, rows):
+        path = os.path.join(
+            self.output_dir, f'{DATA_FILES[model_cl.__name__]}.csv'
+        )
+        progress = Progress(0, self.write)
+        with open(path, 'w', encoding='utf-8', newline='') as out:
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                progress.add(1)
+        return progress
+
+
+class Command(BaseCommand):
+    help = 'Generates a seeded synthetic dataset for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument(
+            '--max-genres-per-title', type=int, default=3
+        )
+        parser.add_argument(
+            '--max-reviews-per-title', type=int, default=1000,
+            help='Upper bound of the Zipf distribution of reviews per title'
+        )
+        parser.add_argument(
+            '--zipf-exponent', type=float, default=1.2,
+            help='Exponent of the Zipf distribution of reviews per title'
+        )
+        parser.add_argument(
+            '--comments-per-review', type=float, default=1.0,
+            help='Mean number of comments per review'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--csv', type=str, dest='output_dir', metavar='DIR',
+            help='Write csv-files loadable by "importcsv --all DIR" '
+                 'instead of the database'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['categories'] < 1 \
+                or options['genres'] < 1:
+            raise CommandError('Need at least one user, category and genre')
+        self.options = options
+        if options['output_dir']:
+            self.sink = CsvSink(options['output_dir'], self.stdout.write)
+        else:
+            self.sink = DatabaseSink(options['batch_size'], self.stdout.write)
+
+        self.models = {
+            name: apps.get_model('reviews', name) for name in DATA_FILES
+        }
+        self.offsets = {
+            name: self.sink.id_offset(model_cl)
+            for name, model_cl in self.models.items()
+        }
+        self.review_count = 0
+
+        self.save('User', (
+            'id', 'username', 'email', 'role', 'bio',
+            'first_name', 'last_name'
+        ), self.user_rows())
+        self.save('Category', ('id', 'name', 'slug'), self.category_rows())
+        self.save('Genre', ('id', 'name', 'slug'), self.genre_rows())
+        self.save('Title', (
+            'id', 'name', 'year', 'category', 'description'
+        ), self.title_rows())
+        self.save('GenreTitle', (
+            'id', 'title_id', 'genre_id'
+        ), self.genre_title_rows())
+        self.save('Review', (
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        ), self.review_rows())
+        self.save('Comment', (
+            'id', 'review_id', 'text', 'author', 'pub_date'
+        ), self.comment_rows())
+
+        if not options['output_dir']:
+            reset_sequences(list(self.models.values()))
+            # bulk_create не отправляет сигналы, рейтинги пересчитываем целиком
+            rebuild_ratings()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Dataset successfully generated'
+            )
+        )
+
+    def save(self, name, columns, rows):
+        progress = self.sink.save(self.models[name], columns, rows)
+        self.stdout.write(
+            f'{name}: {progress.rows} rows, {progress.rate:.0f} rows/sec'
+        )
+
+    def rng(self, name):
+        """Отдельный генератор на таблицу: данные не зависят от порядка."""
+        return random.Random(f'{self.options["seed"]}:{name}')
+
+    def ids(self, name, count):
+        start = self.offsets[name] + 1
+        return range(start, start + count)
+
+    def text(self, rng, words):
+        return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+    def pub_date(self, rng):
+        return (
+            BASE_DATE + dt.timedelta(seconds=rng.randrange(10 ** 8))
+        ).isoformat()
+
+    def user_rows(self):
+        rng = self.rng('users')
+        for user_id in self.ids('User', self.options['users']):
+            yield (
+                user_id, f'user{user_id}', f'user{user_id}@yamdb.fake',
+                rng.choice(ROLES), '', '', ''
+            )
+
+    def category_rows(self):
+        for category_id in self.ids('Category', self.options['categories']):
+            yield (
+                category_id, f'Категория {category_id}',
+                f'category-{category_id}'
+            )
+
+    def genre_rows(self):
+        for genre_id in self.ids('Genre', self.options['genres']):
+            yield genre_id, f'Жанр {genre_id}', f'genre-{genre_id}'
+
+    def title_rows(self):
+        rng = self.rng('titles')
+        categories = self.ids('Category', self.options['categories'])
+        for title_id in self.ids('Title', self.options['titles']):
+            yield (
+                title_id, self.text(rng, 3), rng.randint(1900, 2020),
+                rng.choice(categories), self.text(rng, 12)
+            )
+
+    def genre_title_rows(self):
+        rng = self.rng('genre_title')
+        genres = self.ids('Genre', self.options['genres'])
+        max_genres = min(self.options['max_genres_per_title'], len(genres))
+        row_ids = itertools.count(self.offsets['GenreTitle'] + 1)
+        for title_id in self.ids('Title', self.options['titles']):
+            for genre_id in rng.sample(genres, rng.randint(1, max_genres)):
+                yield next(row_ids), title_id, genre_id
+
+    def review_rows(self):
+        """
+        Число отзывов на произведение распределено по Ципфу,
+        авторы отзывов одного произведения различны ('unique_review').
+        """
+        rng = self.rng('reviews')
+        users = self.ids('User', self.options['users'])
+        max_reviews = min(self.options['max_reviews_per_title'], len(users))
+        counts = range(1, max_reviews + 1)
+        cum_weights = zipf_cum_weights(
+            max_reviews, self.options['zipf_exponent']
+        )
+        row_ids = itertools.count(self.offsets['Review'] + 1)
+        for title_id in self.ids('Title', self.options['titles']):
+            count = rng.choices(counts, cum_weights=cum_weights)[0]
+            for author_id in rng.sample(users, count):
+                self.review_count += 1
+                yield (
+                    next(row_ids), title_id, self.text(rng, 20), author_id,
+                    rng.randint(1, 10), self.pub_date(rng)
+                )
+
+    def comment_rows(self):
+        rng = self.rng('comments')
+        users = self.ids('User', self.options['users'])
+        max_comments = round(2 * self.options['comments_per_review'])
+        row_ids = itertools.count(self.offsets['Comment'] + 1)
+        for review_id in self.ids('Review', self.review_count):
+            for _ in range(rng.randint(0, max_comments)):
+                yield (
+                    next(row_ids), review_id, self.text(rng, 10),
+                    rng.choice(users), self.pub_date(rng)
+                )
@@ -1,28 +1,222 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from django.apps import apps
-from django.core.management.base import BaseCommand
-import csv
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from reviews.ratings import rebuild_ratings
+from ._private import (Checkpoint, Progress, column_attnames,
+                       dependency_levels, explicit_dates, model_for_file,
+                       read_batches, reset_sequences)
 
 
 class Command(BaseCommand):
     help = 'Imports data from csv-file'
 
     def add_arguments(self, parser):
-        parser.add_argument('file_path', type=str, help='Define file path')
-        parser.add_argument('model', type=str, help='Define model')
+        parser.add_argument(
+            'file_path', type=str, nargs='?', help='Define file path'
+        )
+        parser.add_argument(
+            'model', type=str, nargs='?', help='Define model'
+        )
+        parser.add_argument(
+            '--all', type=str, dest='data_dir', metavar='DIR',
+            help='Import every csv-file from DIR in foreign key order'
+        )
+        parser.add_argument(
+            '--jobs', type=int, default=4,
+            help='Tables loaded concurrently in --all mode '
+                 '(SQLite always loads one table at a time)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows per bulk insert and transaction'
+        )
+        parser.add_argument(
+            '--progress-every', type=int, default=100000,
+            help='Report progress every N rows, 0 disables reports'
+        )
+        parser.add_argument(
+            '--upsert', action='store_true',
+            help='Update rows with existing keys instead of failing'
+        )
+        parser.add_argument(
+            '--key', type=str,
+            help='Natural key for --upsert, e.g. slug (default: id)'
+        )
+        parser.add_argument(
+            '--checkpoint', type=str, metavar='NAME',
+            help='Record committed batches under NAME in the database '
+                 'and resume from them'
+        )
 
     def handle(self, *args, **options):
-        file_path = options["file_path"]
-        model_cl = apps.get_model('reviews', options["model"])
+        self.batch_size = options['batch_size']
+        self.progress_every = options['progress_every']
+        self.upsert = options['upsert']
+        self.key = options['key']
+        self.checkpoint = (
+            Checkpoint(options['checkpoint']) if options['checkpoint']
+            else None
+        )
+        if self.key and options['data_dir']:
+            raise CommandError('--key is supported for a single file only')
+
+        if options['data_dir']:
+            loaded = self.import_dir(options['data_dir'], options['jobs'])
+        elif options['file_path'] and options['model']:
+            model_cl = apps.get_model('reviews', options["model"])
+            self.import_file(options['file_path'], model_cl)
+            loaded = [model_cl]
+        else:
+            raise CommandError('Define file path and model, or --all DIR')
 
-        with open(file_path, "r", encoding="utf-8") as csv_file:
-            reader = csv.reader(csv_file, delimiter=',')
-            header = next(reader)
-            for row in reader:
-                obj_dict = {key: value for key, value in zip(header, row)}
-                model_cl.objects.create(**obj_dict)
+        # bulk_create не отправляет сигналы, рейтинги пересчитываем целиком
+        if {model._meta.model_name for model in loaded} & {'review', 'title'}:
+            rebuild_ratings()
+        if self.checkpoint:
+            self.checkpoint.clear()
 
         self.stdout.write(
             self.style.SUCCESS(
                 'File successfully imported'
             )
         )
+
+    def import_file(self, file_path, model_cl):
+        progress = Progress(self.progress_every, self.stdout.write)
+        state = self.checkpoint.get(file_path) if self.checkpoint else {}
+        if state.get('done'):
+            self.stdout.write(
+                f'{model_cl.__name__}: already imported, skipped'
+            )
+            return
+        done_rows = state.get('rows', 0)
+        if done_rows:
+            self.stdout.write(
+                f'{model_cl.__name__}: resuming after {done_rows} rows'
+            )
+        attnames = None
+
+        # Даты отзывов и комментариев берутся из файла
+        with open(file_path, 'rb') as csv_file, \
+                explicit_dates(model_cl) as fill_dates:
+            batches = read_batches(
+                csv_file, self.batch_size, state.get('offset', 0)
+            )
+            for batch, offset in batches:
+                if attnames is None:
+                    try:
+                        attnames, nullable = column_attnames(
+                            model_cl, batch[0]
+                        )
+                    except FieldDoesNotExist as error:
+                        raise CommandError(f'{file_path}: {error}')
+                objs = [
+                    model_cl(**{
+                        attnames[key]: (
+                            None if value == '' and key in nullable
+                            else value
+                        )
+                        for key, value in obj_dict.items()
+                    })
+                    for obj_dict in batch
+                ]
+                fill_dates(objs)
+                with transaction.atomic():
+                    if self.upsert:
+                        self.upsert_objects(model_cl, objs, batch[0])
+                    else:
+                        # Размер INSERT подбирает Django под лимиты SQLite
+                        model_cl.objects.bulk_create(objs)
+                    if self.checkpoint:
+                        self.checkpoint.save(
+                            file_path,
+                            offset=offset,
+                            rows=done_rows + progress.rows + len(objs)
+                        )
+                progress.add(len(objs))
+
+        if self.checkpoint:
+            self.checkpoint.save(
+                file_path, rows=done_rows + progress.rows, done=True
+            )
+        self.stdout.write(
+            f'{model_cl.__name__}: {progress.rows} rows, '
+            f'{progress.rate:.0f} rows/sec'
+        )
+
+    def upsert_objects(self, model_cl, objs, header):
+        """
+        Обновляет строки, ключ которых уже есть в таблице,
+        остальные вставляет. Ключ - 'id' или натуральный ключ из --key;
+        при натуральном ключе id из файла не используется.
+        Из строк пачки с одинаковым ключом остается последняя.
+        """
+        opts = model_cl._meta
+        key_field = opts.get_field(self.key or opts.pk.name)
+        update_fields = [
+            field.name
+            for field in map(opts.get_field, header)
+            if field is not key_field and not field.primary_key
+        ]
+        by_key = {
+            key_field.to_python(getattr(obj, key_field.attname)): obj
+            for obj in objs
+        }
+        existing = dict(
+            model_cl.objects.filter(**{
+                f'{key_field.name}__in': list(by_key)
+            }).values_list(key_field.attname, 'pk')
+        )
+        new_objs, changed_objs = [], []
+        for key, obj in by_key.items():
+            pk = existing.get(key)
+            if pk is not None:
+                obj.pk = pk
+                changed_objs.append(obj)
+                continue
+            if not key_field.primary_key:
+                # id из файла может совпасть с id другой строки
+                obj.pk = None
+            new_objs.append(obj)
+        model_cl.objects.bulk_create(new_objs)
+        if changed_objs and update_fields:
+            model_cl.objects.bulk_update(changed_objs, update_fields)
+
+    def import_dir(self, data_dir, jobs):
+        models = set(apps.get_app_config('reviews').get_models())
+        files = {}
+        for file_name in sorted(os.listdir(data_dir)):
+            if not file_name.endswith('.csv'):
+                continue
+            model_cl = model_for_file(file_name, models)
+            if model_cl is None:
+                raise CommandError(f'No model matches {file_name}')
+            files[model_cl] = os.path.join(data_dir, file_name)
+
+        # SQLite допускает только одного писателя
+        if connection.vendor == 'sqlite':
+            jobs = 1
+        for level in dependency_levels(set(files)):
+            if jobs > 1 and len(level) > 1:
+                with ThreadPoolExecutor(max_workers=jobs) as executor:
+                    list(executor.map(self.import_file_in_thread, (
+                        (files[model_cl], model_cl) for model_cl in level
+                    )))
+            else:
+                for model_cl in level:
+                    self.import_file(files[model_cl], model_cl)
+
+        # CSV содержат явные id, сдвигаем последовательности за максимум
+        reset_sequences(list(files))
+        return list(files)
+
+    def import_file_in_thread(self, args):
+        try:
+            self.import_file(*args)
+        finally:
+            connection.close()
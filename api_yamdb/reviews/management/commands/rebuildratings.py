@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds stored title ratings from reviews'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_ratings()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Ratings rebuilt for {updated} titles'
+            )
+        )
@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Sends queued emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--max-attempts', type=int, default=settings.OUTBOX_MAX_ATTEMPTS,
+            help='Give up on an email after this many failed attempts'
+        )
+        parser.add_argument(
+            '--backoff', type=int, default=60,
+            help='Delay before the first retry in seconds, doubled each time'
+        )
+        parser.add_argument('--max-backoff', type=int, default=3600)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting when it is empty'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Polling interval in seconds for --loop'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_batch(
+                options['batch_size'], options['max_attempts'],
+                options['backoff'], options['max_backoff']
+            )
+            total_sent += sent
+            total_failed += failed
+            if failed:
+                self.stderr.write(f'{failed} emails failed, will retry')
+            # Полная пачка с успехами - в очереди, скорее всего, есть еще
+            if sent and sent + failed == options['batch_size']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Sent {total_sent} emails, {total_failed} failed'
+            )
+        )
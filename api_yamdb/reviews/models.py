@@ -1,6 +1,8 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth import models as auth_models
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
+from django.utils import timezone
 
 from .utils import max_value_current_year
 
@@ -11,7 +13,25 @@ class UserRole:
     ADMIN = 'admin'
 
 
-class User(AbstractUser):
+# Отправляется после QuerySet.update() пользователей с их pk в pks
+# и именами измененных полей в fields: post_save при этом не срабатывает
+users_updated = Signal()
+
+
+class UserQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        pks = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        users_updated.send(sender=self.model, pks=pks, fields=set(kwargs))
+        return updated
+
+
+class UserManager(auth_models.UserManager.from_queryset(UserQuerySet)):
+    pass
+
+
+class User(auth_models.AbstractUser):
     """Модель пользователя."""
     USER_ROLES = [
         (UserRole.USER, 'Аутентифицированный пользователь'),
@@ -25,9 +45,33 @@ class User(AbstractUser):
     )
     bio = models.TextField('О себе', blank=True)
 
+    objects = UserManager()
+
     class Meta:
         ordering = ['-id']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_username()
+        return instance
+
+    def remember_username(self):
+        """
+        Запоминаем сохраненное имя: оно выводится в отзывах
+        и комментариях, и при переименовании их ответы устаревают.
+        """
+        self._saved_username = self.__dict__.get('username')
+
+    @property
+    def username_changed(self):
+        saved = getattr(self, '_saved_username', None)
+        return saved is not None and saved != self.username
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.remember_username()
+
     @property
     def is_admin_or_superuser(self):
         return (self.is_superuser or self.role == UserRole.ADMIN)
@@ -41,6 +85,22 @@ class User(AbstractUser):
         return self.role == UserRole.USER
 
 
+class TokenUser(User):
+    """
+    Пользователь, собранный из claims JWT без запроса к БД.
+    Заполнены только id, username, role и is_superuser,
+    поэтому сохранять его нельзя.
+    """
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        raise NotImplementedError('TokenUser нельзя сохранить')
+
+    def delete(self, *args, **kwargs):
+        raise NotImplementedError('TokenUser нельзя удалить')
+
+
 class Category(models.Model):
     """
     Категория(тип) произведения.
@@ -111,10 +171,50 @@ class Title(models.Model):
         through='GenreTitle'
     )
     description = models.TextField(blank=True)
+    # Денормализованный рейтинг, поддерживается сигналами 'Review'
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        editable=False,
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    # Счетчик изменений произведения, его жанров, категории и отзывов,
+    # из него и 'modified' строятся ETag и Last-Modified
+    version = models.PositiveIntegerField(
+        verbose_name='Версия',
+        default=0,
+        editable=False,
+    )
+    modified = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
+
+    # Поля меняются только выражениями F() в UPDATE,
+    # save() не должен перезаписывать их устаревшими значениями
+    COUNTER_FIELDS = ('rating', 'review_count', 'score_sum', 'version')
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class GenreTitle(models.Model):
     """
@@ -133,6 +233,10 @@ class GenreTitle(models.Model):
 
     class Meta:
         ordering = ['-id']
+        # Фильтр по жанрам читает title_id прямо из индекса
+        indexes = [
+            models.Index(fields=['genre', 'title'], name='genre_title_idx')
+        ]
 
     def __str__(self):
         title = self.title.name
@@ -180,6 +284,25 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating_state()
+        return instance
+
+    def remember_rating_state(self):
+        """
+        Запоминаем произведение и оценку, учтенные в рейтинге,
+        чтобы при сохранении пересчитать его на разницу.
+        """
+        self._rated_title_id = self.__dict__.get('title_id')
+        self._rated_score = self.__dict__.get('score')
+
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения обновляется в той же транзакции
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """
@@ -208,3 +331,66 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text
+
+
+class ListVersion(models.Model):
+    """
+    Версия списка целиком, например списка произведений.
+    Растет при любом изменении, которое может поменять его страницы;
+    из нее ETag и Last-Modified списка строятся одним запросом
+    без обхода таблицы.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Позиция последней закоммиченной пачки файла в загрузке importcsv.
+    Пишется в транзакции пачки, поэтому не расходится с данными.
+    """
+    name = models.CharField(max_length=255)
+    file = models.CharField(max_length=512)
+    offset = models.BigIntegerField(default=0)
+    rows = models.BigIntegerField(default=0)
+    done = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'file'],
+                                    name='unique_import_checkpoint')
+        ]
+
+    def __str__(self):
+        return f'{self.name}: {self.file}'
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку.
+    Отправляет команда sendoutbox, неудачные попытки
+    повторяются с экспоненциальной задержкой.
+    """
+    subject = models.CharField(max_length=256)
+    body = models.TextField()
+    from_email = models.CharField(max_length=256, blank=True)
+    to = models.TextField('Получатели через запятую')
+    created = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    sent = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['next_attempt', 'id']
+        indexes = [
+            models.Index(fields=['sent', 'next_attempt'],
+                         name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.to}'
@@ -0,0 +1,103 @@
+import datetime as dt
+import smtplib
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+# На это время захваченное письмо скрыто от других отправителей;
+# если процесс упал во время отправки, письмо повторится после него
+CLAIM_TIMEOUT = dt.timedelta(minutes=10)
+
+
+def enqueue_email(subject, body, from_email, recipient_list):
+    """Ставит письмо в очередь, отправит его команда sendoutbox."""
+    return OutboxEmail.objects.create(
+        subject=subject, body=body, from_email=from_email or '',
+        to=','.join(recipient_list)
+    )
+
+
+def retry_delay(attempts, backoff, max_backoff):
+    """Экспоненциальная задержка: backoff, 2 * backoff, 4 * backoff..."""
+    delay = min(backoff * 2 ** (attempts - 1), max_backoff)
+    return dt.timedelta(seconds=delay)
+
+
+def claim(emails):
+    """
+    Захватывает письма условным UPDATE по числу попыток: из нескольких
+    отправителей, прочитавших одно письмо, его получит только один.
+    Возвращает захваченные письма с уже увеличенным attempts.
+    """
+    claimed = []
+    lease = timezone.now() + CLAIM_TIMEOUT
+    for email in emails:
+        updated = OutboxEmail.objects.filter(
+            pk=email.pk, attempts=email.attempts, sent__isnull=True
+        ).update(attempts=F('attempts') + 1, next_attempt=lease)
+        if updated:
+            email.attempts += 1
+            claimed.append(email)
+    return claimed
+
+
+def send_emails(emails):
+    """Отправляет письма через одно соединение, возвращает ошибки по pk."""
+    errors = {}
+    connection = get_connection()
+    try:
+        connection.open()
+    except (smtplib.SMTPException, OSError) as error:
+        return {email.pk: error for email in emails}
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email or None,
+                email.to.split(','), connection=connection
+            )
+            try:
+                message.send()
+            except (smtplib.SMTPException, OSError) as error:
+                errors[email.pk] = error
+    finally:
+        connection.close()
+    return errors
+
+
+def send_batch(batch_size=100, max_attempts=None, backoff=60,
+               max_backoff=3600):
+    """
+    Отправляет до batch_size писем, которым подошел срок,
+    через одно соединение с почтовым сервером.
+    Каждое письмо перед отправкой захватывается, поэтому несколько
+    процессов sendoutbox не отправят одно письмо дважды.
+    Возвращает число отправленных и неудачных писем.
+    """
+    if max_attempts is None:
+        max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+    emails = claim(OutboxEmail.objects.filter(
+        sent__isnull=True, attempts__lt=max_attempts,
+        next_attempt__lte=timezone.now()
+    )[:batch_size])
+    if not emails:
+        return 0, 0
+
+    errors = send_emails(emails)
+    now = timezone.now()
+    for email in emails:
+        error = errors.get(email.pk)
+        if error is None:
+            email.sent = now
+        else:
+            email.next_attempt = now + retry_delay(
+                email.attempts, backoff, max_backoff
+            )
+            email.last_error = f'{type(error).__name__}: {error}'
+    OutboxEmail.objects.bulk_update(
+        emails, ['sent', 'next_attempt', 'last_error']
+    )
+    return len(emails) - len(errors), len(errors)
@@ -0,0 +1,11 @@
+def apply_pragmas(sender, connection, **kwargs):
+    """
+    Выполняет PRAGMA из DATABASES[alias]['PRAGMAS'] на новом соединении:
+    настройки вроде synchronous и cache_size действуют только в нем.
+    """
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,90 @@
+from django.db.models import (Avg, Case, Count, F, FloatField, OuterRef,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce, Now
+
+from .models import ListVersion, Review, Title
+
+TITLE_LIST = 'titles'
+
+
+def bump_list_version(name=TITLE_LIST):
+    """Отмечает список измененным: версия +1, новая дата."""
+    updated = ListVersion.objects.filter(name=name).update(
+        version=F('version') + 1, modified=Now()
+    )
+    if not updated:
+        ListVersion.objects.get_or_create(name=name, defaults={'version': 1})
+
+
+def create_list_versions(using='default', **kwargs):
+    """
+    Создает строки версий списков, чтобы запись в API обходилась
+    одним UPDATE. Подключен к post_migrate.
+    """
+    ListVersion.objects.using(using).get_or_create(name=TITLE_LIST)
+
+
+def touch_titles(titles):
+    """Отмечает произведения измененными: версия +1, новая дата."""
+    updated = titles.update(version=F('version') + 1, modified=Now())
+    if updated:
+        bump_list_version()
+    return updated
+
+
+def apply_review_delta(title_id, score_delta, count_delta):
+    """
+    Инкрементально обновляет сумму оценок, число отзывов
+    и рейтинг произведения одним UPDATE, заодно увеличивая версию.
+    В SET все выражения вычисляются по значениям до обновления.
+    """
+    review_count = F('review_count') + count_delta
+    score_sum = F('score_sum') + score_delta
+    Title.objects.filter(pk=title_id).update(
+        review_count=review_count,
+        score_sum=score_sum,
+        version=F('version') + 1,
+        modified=Now(),
+        rating=Case(
+            When(review_count=-count_delta, then=Value(None)),
+            default=(
+                Cast(score_sum, FloatField())
+                / Cast(review_count, FloatField())
+            ),
+            output_field=FloatField(),
+        ),
+    )
+    bump_list_version()
+
+
+def rebuild_ratings(title_ids=None):
+    """
+    Пересчитывает рейтинги с нуля по таблице отзывов:
+    для всех произведений или только для 'title_ids'.
+    Возвращает количество обновленных произведений.
+    """
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    titles = Title.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    updated = titles.update(
+        review_count=Coalesce(
+            Subquery(reviews.annotate(value=Count('pk')).values('value')),
+            0
+        ),
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(value=Sum('score')).values('value')),
+            0
+        ),
+        rating=Subquery(
+            reviews.annotate(value=Avg('score')).values('value'),
+            output_field=FloatField()
+        ),
+        version=F('version') + 1,
+        modified=Now(),
+    )
+    if updated:
+        bump_list_version()
+    return updated
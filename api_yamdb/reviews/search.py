@@ -0,0 +1,104 @@
+import re
+
+from django.db import connections
+
+from .models import Title
+
+FTS_TABLE = 'reviews_title_fts'
+TRIGGERS = tuple(f'{FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au'))
+# Базы, в которых индекс уже найден: не проверяем sqlite_master на каждый поиск
+_indexed = set()
+
+# Внешний контент FTS5: индекс хранит только токены,
+# триггеры синхронизируют его с reviews_title при любых записях,
+# включая bulk_create и raw SQL. Пересборка reviews_title при миграциях
+# SQLite удаляет триггеры, поэтому все создается с IF NOT EXISTS
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"name, description, content='reviews_title', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai "
+    f"AFTER INSERT ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    f"VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad "
+    f"AFTER DELETE ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    f"AFTER UPDATE OF name, description "
+    f"ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    f"VALUES (new.id, new.name, new.description); END",
+    # Совпадение в названии весит больше, чем в описании
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) "
+    f"VALUES ('rank', 'bm25(10.0, 1.0)')",
+)
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def has_search_index(using='default'):
+    """
+    Индекс рабочий, только если на месте триггеры синхронизации:
+    без них таблица FTS отстает от reviews_title.
+    """
+    connection = connections[using]
+    if using not in _indexed and connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master "
+                "WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+                TRIGGERS
+            )
+            if cursor.fetchone()[0] == len(TRIGGERS):
+                _indexed.add(using)
+    return using in _indexed
+
+
+def create_search_index(using='default', **kwargs):
+    """
+    Создает недостающие части FTS5-индекса произведений и заново
+    заполняет его текущими данными. Подключен к post_migrate.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    _indexed.discard(using)
+    if Title._meta.db_table not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for sql in CREATE_SQL:
+            cursor.execute(sql)
+        cursor.execute(REBUILD_SQL)
+
+
+def to_match_query(text):
+    """
+    Переводит пользовательский запрос в синтаксис FTS5:
+    каждое слово ищется по префиксу, все слова обязательны.
+    """
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_titles(queryset, text):
+    """
+    Фильтрует произведения по названию и описанию через FTS5,
+    сортируя по релевантности (bm25). Без индекса - поиск icontains.
+    """
+    match = to_match_query(text)
+    if not match:
+        return queryset.none()
+    if not has_search_index(queryset.db):
+        return queryset.filter(name__icontains=text)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = {Title._meta.db_table}.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+        order_by=[f'{FTS_TABLE}.rank'],
+    )
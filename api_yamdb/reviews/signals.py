@@ -0,0 +1,103 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .models import (Category, Genre, GenreTitle, Review, Title, User,
+                     users_updated)
+from .ratings import (apply_review_delta, bump_list_version, rebuild_ratings,
+                      touch_titles)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Учитывает новый или измененный отзыв в рейтинге произведения."""
+    if raw:
+        return
+    if created:
+        apply_review_delta(instance.title_id, instance.score, 1)
+    else:
+        old_title_id = getattr(instance, '_rated_title_id', None)
+        old_score = getattr(instance, '_rated_score', None)
+        if old_title_id is None or old_score is None:
+            # Исходное состояние неизвестно, пересчитываем с нуля
+            rebuild_ratings(title_ids=[instance.title_id])
+        elif old_title_id != instance.title_id:
+            apply_review_delta(old_title_id, -old_score, -1)
+            apply_review_delta(instance.title_id, instance.score, 1)
+        else:
+            # Без изменения оценки только увеличивается версия
+            apply_review_delta(
+                instance.title_id, instance.score - old_score, 0
+            )
+    instance.remember_rating_state()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """
+    Исключает удаленный отзыв из рейтинга.
+    Срабатывает и при каскадном удалении.
+    """
+    apply_review_delta(instance.title_id, -instance.score, -1)
+
+
+@receiver(post_save, sender=Title)
+def bump_version_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        bump_list_version()
+    else:
+        touch_titles(Title.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Title)
+def bump_version_on_delete(sender, instance, **kwargs):
+    bump_list_version()
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def bump_version_on_genre_link(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_titles(Title.objects.filter(pk=instance.title_id))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_version_on_genres_set(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        touch_titles(Title.objects.filter(pk=instance.pk))
+    elif pk_set:
+        touch_titles(Title.objects.filter(pk__in=pk_set))
+    else:
+        touch_titles(Title.objects.all())
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def bump_version_on_category(sender, instance, raw=False, **kwargs):
+    """Название категории входит в ответ произведения."""
+    if not raw:
+        touch_titles(Title.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Genre)
+def bump_version_on_genre(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_titles(Title.objects.filter(genre=instance))
+
+
+@receiver(post_save, sender=User)
+def bump_version_on_rename(sender, instance, raw=False, **kwargs):
+    """Имя автора входит в список отзывов произведения."""
+    if not raw and instance.username_changed:
+        touch_titles(Title.objects.filter(reviews__author=instance))
+
+
+@receiver(users_updated, sender=User)
+def bump_version_on_bulk_rename(sender, pks, fields, **kwargs):
+    if 'username' in fields:
+        touch_titles(Title.objects.filter(reviews__author__in=pks))
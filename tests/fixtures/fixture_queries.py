@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.urls import Resolver404, resolve
+
+# (имя маршрута, метод) -> наибольшее число SQL запросов за один запрос,
+# включая middleware, аутентификацию и проверку прав
+QUERY_BUDGETS = {
+    ('title-list', 'GET'): 6,
+    ('title-detail', 'GET'): 4,
+    ('reviews-list', 'GET'): 5,
+    ('reviews-list', 'POST'): 8,
+    ('comments-list', 'GET'): 4,
+    ('comments-list', 'POST'): 3,
+    ('user-list', 'GET'): 3,
+    ('signup', 'POST'): 5,
+}
+
+
+class QueryBudget:
+    """
+    Считает SQL запросы каждого запроса к API по всем базам, включая
+    реплики, и запоминает превышения бюджета. Сигналы запроса не должны
+    падать, поэтому проверка - в check() после теста.
+    """
+
+    def __init__(self, budgets):
+        self.budgets = budgets
+        # Запросы ASGI обрабатываются в других потоках
+        self.local = threading.local()
+        self.checked = []
+        self.exceeded = []
+        self.wrapped = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(self.local, 'key', None) is not None:
+            self.local.queries += 1
+        return execute(sql, params, many, context)
+
+    def wrap(self, connection, **kwargs):
+        """Подключается к соединению; годится как приемник connection_created."""
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+            self.wrapped.append(connection)
+
+    def unwrap(self):
+        for connection in self.wrapped:
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+        self.wrapped = []
+
+    def started(self, sender, environ, **kwargs):
+        try:
+            route = resolve(environ['PATH_INFO']).view_name
+        except Resolver404:
+            route = None
+        key = (route, environ['REQUEST_METHOD'])
+        self.local.key = key if key in self.budgets else None
+        self.local.queries = 0
+
+    def finished(self, sender, **kwargs):
+        key = getattr(self.local, 'key', None)
+        if key is None:
+            return
+        self.local.key = None
+        self.checked.append((key, self.local.queries))
+        if self.local.queries > self.budgets[key]:
+            self.exceeded.append((key, self.local.queries))
+
+    def check(self):
+        messages = [
+            f'Проверьте, что {method} запрос `{route}` выполняет не больше '
+            f'{self.budgets[route, method]} запросов к БД, выполнено {queries}'
+            for (route, method), queries in self.exceeded
+        ]
+        assert not messages, '\n'.join(messages)
+
+
+@pytest.fixture(autouse=True)
+def query_budget():
+    budget = QueryBudget(QUERY_BUDGETS)
+    for connection in connections.all():
+        budget.wrap(connection)
+    # Соединения других потоков и реплик, добавленных в тесте
+    connection_created.connect(budget.wrap)
+    request_started.connect(budget.started)
+    request_finished.connect(budget.finished)
+    try:
+        yield budget
+    finally:
+        connection_created.disconnect(budget.wrap)
+        request_started.disconnect(budget.started)
+        request_finished.disconnect(budget.finished)
+        budget.unwrap()
+    budget.check()
@@ -0,0 +1,28 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Копия тестовой базы в файле вместо реплики, snapshot() обновляет ее."""
+    from django.db import connection, connections
+
+    path = str(tmp_path / 'replica.sqlite3')
+
+    def snapshot():
+        connections['replica'].close()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+
+    connection.ensure_connection()
+    connections.databases['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': path,
+    }
+    settings.DATABASE_REPLICAS = ['replica']
+    snapshot()
+    yield snapshot
+    connections['replica'].close()
+    del connections['replica']
+    del connections.databases['replica']
@@ -0,0 +1,60 @@
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test08Rating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (3, 12, 4), (
+            'Проверьте, что при создании отзыва пересчитывается рейтинг произведения'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+            data={'score': 8}
+        )
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (3, 15, 5), (
+            'Проверьте, что при изменении оценки пересчитывается рейтинг произведения'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/')
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (2, 12, 6), (
+            'Проверьте, что при удалении отзыва пересчитывается рейтинг произведения'
+        )
+
+        moderator.delete()
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (1, 8, 8), (
+            'Проверьте, что при каскадном удалении отзывов пересчитывается рейтинг произведения'
+        )
+
+        Review.objects.all().delete()
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (0, 0, None), (
+            'Проверьте, что рейтинг произведения без отзывов равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings_command(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(rating=None, review_count=0, score_sum=0)
+        call_command('rebuildratings')
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (3, 12, 4), (
+            'Проверьте, что команда `rebuildratings` пересчитывает рейтинги'
+        )
+        title = Title.objects.get(id=titles[1]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (0, 0, None), (
+            'Проверьте, что команда `rebuildratings` обнуляет рейтинг произведения без отзывов'
+        )
@@ -0,0 +1,104 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import (auth_client, create_categories, create_comments,
+                     create_genre, create_titles)
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+    )
+    return len(context.captured_queries)
+
+
+class Test09Queries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_list_query_count(self, client, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+
+        def create_title(number):
+            data = {'name': f'Произведение {number}', 'year': 2000,
+                    'genre': [genre['slug'] for genre in genres],
+                    'category': categories[0]['slug']}
+            admin_client.post('/api/v1/titles/', data=data)
+
+        create_title(0)
+        one_title = count_queries(client, '/api/v1/titles/')
+        for number in range(1, 5):
+            create_title(number)
+        full_page = count_queries(client, '/api/v1/titles/')
+        assert one_title == full_page == 4, (
+            'Проверьте, что при GET запросе `/api/v1/titles/` число запросов к БД '
+            'не зависит от количества произведений на странице: '
+            'версия для ETag, count, произведения с категориями, жанры'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_create_single_title_lookup(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == 201, (
+            f'Проверьте, что при POST запросе `{url}` с правильными данными возвращается статус 201'
+        )
+        title_selects = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "reviews_title"' in query['sql']
+        ]
+        assert len(title_selects) == 1, (
+            f'Проверьте, что при POST запросе `{url}` произведение запрашивается из БД один раз'
+        )
+        response = admin_client.post(url, data={'text': 'Еще текст', 'score': 1})
+        assert response.status_code == 400 and response.json() == {
+            'non_field_errors': ['Возможно оставить только один отзыв']
+        }, (
+            f'Проверьте, что при повторном POST запросе `{url}` возвращается статус 400 '
+            'с сообщением об ошибке'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_comment_list_query_count(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        review_queries = count_queries(client, reviews_url)
+        comment_queries = count_queries(client, comments_url)
+
+        for number in range(2):
+            author = get_user_model().objects.create_user(
+                username=f'Author{number}', email=f'author{number}@yamdb.fake'
+            )
+            author_client = auth_client(author)
+            author_client.post(reviews_url, data={'text': 'Текст', 'score': 5})
+            author_client.post(comments_url, data={'text': 'Текст'})
+
+        assert count_queries(client, reviews_url) == review_queries == 4, (
+            f'Проверьте, что при GET запросе `{reviews_url}` число запросов к БД '
+            'не зависит от количества отзывов и их авторов на странице'
+        )
+        assert count_queries(client, comments_url) == comment_queries == 3, (
+            f'Проверьте, что при GET запросе `{comments_url}` число запросов к БД '
+            'не зависит от количества комментариев и их авторов на странице'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_review_other_integrity_errors(self, admin_client, monkeypatch):
+        from django.db import IntegrityError
+        from rest_framework import serializers
+
+        titles, _, _ = create_titles(admin_client)
+
+        def create(self, validated_data):
+            raise IntegrityError('NOT NULL constraint failed: reviews_review.text')
+
+        monkeypatch.setattr(serializers.ModelSerializer, 'create', create)
+        with pytest.raises(IntegrityError):
+            admin_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'Текст', 'score': 5})
@@ -0,0 +1,58 @@
+import pytest
+
+from .common import create_comments, create_titles
+
+
+def collect_cursor_pages(client, url):
+    results = []
+    response = client.get(url, {'pagination': 'cursor'})
+    while True:
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` с курсорной пагинацией возвращается статус 200'
+        )
+        data = response.json()
+        assert 'count' not in data and 'next' in data and 'previous' in data, (
+            f'Проверьте, что при GET запросе `{url}` с `pagination=cursor` '
+            'возвращаются `next` и `previous` без `count`'
+        )
+        results.extend(data['results'])
+        if not data['next']:
+            return results
+        response = client.get(data['next'])
+
+
+class Test10Pagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        for number in range(6):
+            data = {'name': f'Произведение {number}', 'year': 2000,
+                    'genre': titles[0]['genre'], 'category': titles[0]['category']}
+            admin_client.post('/api/v1/titles/', data=data)
+
+        results = collect_cursor_pages(client, '/api/v1/titles/')
+        ids = [title['id'] for title in results]
+        assert len(ids) == 8 and ids == sorted(ids, reverse=True), (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'возвращает все произведения по убыванию `id`'
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.json().get('count') == 8, (
+            'Проверьте, что без `pagination=cursor` `/api/v1/titles/` '
+            'использует постраничную пагинацию'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_comments_cursor(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        results = collect_cursor_pages(client, url)
+        assert sorted(review['id'] for review in results) == sorted(review['id'] for review in reviews), (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все отзывы'
+        )
+        url = f'{url}{reviews[0]["id"]}/comments/'
+        results = collect_cursor_pages(client, url)
+        assert sorted(comment['id'] for comment in results) == sorted(comment['id'] for comment in comments), (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все комментарии'
+        )
@@ -0,0 +1,194 @@
+import os
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from .conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+class Test11Import:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_importcsv_batches(self):
+        from reviews.models import Genre
+
+        out = StringIO()
+        call_command(
+            'importcsv', os.path.join(DATA_DIR, 'genre.csv'), 'Genre',
+            batch_size=4, progress_every=4, stdout=out
+        )
+        assert Genre.objects.count() == 15, (
+            'Проверьте, что команда `importcsv` загружает все строки файла'
+        )
+        assert Genre.objects.get(id=1).slug == 'drama', (
+            'Проверьте, что команда `importcsv` сохраняет значения из файла'
+        )
+        assert 'rows/sec' in out.getvalue(), (
+            'Проверьте, что команда `importcsv` сообщает о скорости загрузки'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_importcsv_all(self):
+        from reviews.models import Category, Comment, GenreTitle, Review, Title
+
+        call_command('importcsv', all=DATA_DIR, stdout=StringIO())
+        assert Title.objects.count() == 32 and GenreTitle.objects.count() == 42, (
+            'Проверьте, что `importcsv --all` загружает все файлы каталога'
+        )
+        assert Review.objects.count() > 0 and Comment.objects.count() > 0, (
+            'Проверьте, что `importcsv --all` загружает отзывы и комментарии'
+        )
+        title = Title.objects.get(id=1)
+        assert title.category_id == 1 and title.review_count == title.reviews.count(), (
+            'Проверьте, что `importcsv --all` связывает записи по id и пересчитывает рейтинги'
+        )
+        assert Review.objects.get(id=1).pub_date.isoformat() == '2019-09-24T21:08:21.567000+00:00', (
+            'Проверьте, что `importcsv` сохраняет даты публикации из файла'
+        )
+        assert Comment.objects.get(id=1).pub_date.year == 2020
+        category = Category.objects.create(name='Музыка', slug='music-new')
+        assert category.id > 3, (
+            'Проверьте, что после `importcsv --all` новые записи создаются без конфликтов id'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_importcsv_upsert_and_resume(self, tmp_path):
+        from django.db import IntegrityError
+        from reviews.models import Genre, ImportCheckpoint
+
+        csv_path = tmp_path / 'genre.csv'
+        checkpoint = 'genre'
+        rows = ['id,name,slug'] + [f'{number},Жанр {number},genre-{number}' for number in range(1, 5)]
+        csv_path.write_text('\n'.join(rows + ['1,Жанр 5,genre-5', '6,Жанр 6,genre-6']) + '\n')
+        with pytest.raises(IntegrityError):
+            call_command('importcsv', str(csv_path), 'Genre', batch_size=4,
+                         checkpoint=checkpoint, stdout=StringIO())
+        assert Genre.objects.count() == 4 and ImportCheckpoint.objects.filter(name=checkpoint).exists(), (
+            'Проверьте, что `importcsv --checkpoint` сохраняет позицию закоммиченной пачки'
+        )
+
+        csv_path.write_text(csv_path.read_text().replace('Жанр 2', 'Жанр X'))
+        call_command('importcsv', str(csv_path), 'Genre', batch_size=4, upsert=True,
+                     checkpoint=checkpoint, stdout=StringIO())
+        assert Genre.objects.count() == 5 and Genre.objects.get(id=1).slug == 'genre-5', (
+            'Проверьте, что `importcsv --upsert` продолжает загрузку с сохраненной позиции '
+            'и обновляет существующие строки'
+        )
+        assert Genre.objects.get(id=2).name == 'Жанр 2' and not ImportCheckpoint.objects.exists(), (
+            'Проверьте, что при возобновлении загруженные строки не перечитываются, '
+            'а после успешной загрузки checkpoint удаляется'
+        )
+
+        csv_path.write_text('id,name,slug\n10,Новое имя,genre-6\n')
+        call_command('importcsv', str(csv_path), 'Genre', upsert=True, key='slug', stdout=StringIO())
+        genre = Genre.objects.get(slug='genre-6')
+        assert (genre.id, genre.name, Genre.objects.count()) == (6, 'Новое имя', 5), (
+            'Проверьте, что `importcsv --upsert --key slug` обновляет строку по натуральному ключу'
+        )
+
+        csv_path.write_text('id,name,slug\n1,Первый,genre-new\n2,Второй,genre-new\n')
+        call_command('importcsv', str(csv_path), 'Genre', upsert=True, key='slug', stdout=StringIO())
+        genre = Genre.objects.get(slug='genre-new')
+        assert genre.name == 'Второй' and genre.id not in (1, 2), (
+            'Проверьте, что `importcsv --upsert --key` оставляет последнюю строку с одинаковым ключом '
+            'и не использует id из файла'
+        )
+        assert Genre.objects.get(id=1).slug == 'genre-5'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_exportdata_roundtrip(self, tmp_path):
+        import gzip
+        import json
+
+        from reviews.models import Category, Comment, Genre, Review, Title
+
+        call_command('importcsv', all=DATA_DIR, stdout=StringIO())
+        counts = (Title.objects.count(), Review.objects.count(), Comment.objects.count())
+        dates = [list(model.objects.order_by('id').values_list('id', 'pub_date')) for model in (Review, Comment)]
+
+        call_command('exportdata', output_dir=str(tmp_path / 'csv'), jobs=2, stdout=StringIO())
+        call_command('exportdata', 'Review', output_dir=str(tmp_path / 'json'),
+                     format='ndjson', gzip=True, stdout=StringIO())
+        with gzip.open(tmp_path / 'json' / 'review.ndjson.gz', 'rt', encoding='utf-8') as export_file:
+            reviews = [json.loads(line) for line in export_file]
+        assert len(reviews) == counts[1] and 'title_id' in reviews[0], (
+            'Проверьте, что `exportdata --format ndjson --gzip` выгружает все строки'
+        )
+
+        for model in (Title, Category, Genre):
+            model.objects.all().delete()
+        get_user_model().objects.all().delete()
+        call_command('importcsv', all=str(tmp_path / 'csv'), stdout=StringIO())
+        assert (Title.objects.count(), Review.objects.count(), Comment.objects.count()) == counts, (
+            'Проверьте, что выгрузка `exportdata` загружается обратно через `importcsv --all`'
+        )
+        assert [list(model.objects.order_by('id').values_list('id', 'pub_date'))
+                for model in (Review, Comment)] == dates, (
+            'Проверьте, что после выгрузки и загрузки даты публикации не меняются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_generatedata(self, tmp_path):
+        from reviews.models import Comment, GenreTitle, Review, Title
+
+        options = {'users': 20, 'titles': 15, 'categories': 3, 'genres': 5,
+                   'max_reviews_per_title': 10, 'comments_per_review': 1, 'seed': 7}
+        call_command('generatedata', csv=str(tmp_path / 'first'), stdout=StringIO(), **options)
+        call_command('generatedata', csv=str(tmp_path / 'second'), stdout=StringIO(), **options)
+        assert (tmp_path / 'first' / 'review.csv').read_text() == (tmp_path / 'second' / 'review.csv').read_text(), (
+            'Проверьте, что `generatedata` с одинаковым `--seed` генерирует одинаковые данные'
+        )
+
+        call_command('importcsv', all=str(tmp_path / 'first'), stdout=StringIO())
+        counts = [Title.objects.count(), GenreTitle.objects.count(),
+                  Review.objects.count(), Comment.objects.count()]
+        assert counts[0] == 15 and all(counts), (
+            'Проверьте, что результат `generatedata --csv` загружается через `importcsv --all`'
+        )
+
+        last_review_id = Review.objects.order_by('-id').first().id
+        call_command('generatedata', stdout=StringIO(), **options)
+        assert [Title.objects.count(), GenreTitle.objects.count(),
+                Review.objects.count(), Comment.objects.count()] == [count * 2 for count in counts], (
+            'Проверьте, что `generatedata` записывает данные в БД после уже загруженных'
+        )
+        generated = Review.objects.filter(id__gt=last_review_id)
+        assert not generated.filter(pub_date__year__gte=2020).exists() and generated.dates('pub_date', 'year').count() > 1, (
+            'Проверьте, что `generatedata` сохраняет в БД сгенерированные даты публикации'
+        )
+        title = Title.objects.order_by('-id').first()
+        assert title.review_count == title.reviews.count() > 0, (
+            'Проверьте, что `generatedata` пересчитывает рейтинги произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_resume_after_checkpoint_failure(self, tmp_path, monkeypatch):
+        from reviews.management.commands._private import Checkpoint
+        from reviews.models import Genre
+
+        csv_path = tmp_path / 'genre.csv'
+        rows = ['id,name,slug'] + [f'{number},Жанр {number},genre-{number}' for number in range(1, 7)]
+        csv_path.write_text('\n'.join(rows) + '\n')
+        save = Checkpoint.save
+
+        def crash_on_second_batch(self, file_path, **state):
+            # Процесс упал при записи позиции второй пачки
+            if state.get('rows') == 4:
+                raise RuntimeError('crash')
+            save(self, file_path, **state)
+
+        monkeypatch.setattr(Checkpoint, 'save', crash_on_second_batch)
+        with pytest.raises(RuntimeError):
+            call_command('importcsv', str(csv_path), 'Genre', batch_size=2,
+                         checkpoint='genre', stdout=StringIO())
+        monkeypatch.setattr(Checkpoint, 'save', save)
+        call_command('importcsv', str(csv_path), 'Genre', batch_size=2,
+                     checkpoint='genre', stdout=StringIO())
+        assert Genre.objects.count() == 6, (
+            'Проверьте, что `importcsv --checkpoint` сохраняет позицию в транзакции пачки '
+            'и возобновленная загрузка не вставляет закоммиченные строки повторно'
+        )
@@ -0,0 +1,100 @@
+import pytest
+
+from .common import create_titles
+
+
+def found_names(client, params):
+    response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200, (
+        'Проверьте, что при GET запросе `/api/v1/titles/` с фильтрами возвращается статус 200'
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+class Test12TitleFilters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search(self, client, admin_client):
+        create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Драма', 'year': 1999, 'genre': ['drama'],
+            'category': 'films', 'description': 'Про поворот'
+        })
+        assert found_names(client, {'search': 'пов'}) == ['Поворот туда', 'Драма'], (
+            'Проверьте, что фильтр `search` ищет по префиксу в названии и описании '
+            'и сортирует результаты по релевантности'
+        )
+        assert found_names(client, {'search': 'главная драма'}) == ['Проект'], (
+            'Проверьте, что фильтр `search` требует совпадения всех слов запроса'
+        )
+
+        from reviews.models import Title
+        Title.objects.filter(name='Проект').update(name='Запуск')
+        assert found_names(client, {'search': 'запуск'}) == ['Запуск'], (
+            'Проверьте, что поисковый индекс обновляется при изменении произведения'
+        )
+        Title.objects.filter(name='Запуск').delete()
+        assert found_names(client, {'search': 'запуск'}) == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_genre_category_slugs(self, client, admin_client):
+        create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Комедия ужасов', 'year': 1999, 'genre': ['horror', 'comedy', 'drama'],
+            'category': 'books', 'description': ''
+        })
+        exact = {'slug_match': 'exact'}
+        assert found_names(client, {'genre': 'hor'}) == ['Комедия ужасов', 'Поворот туда'], (
+            'Проверьте, что фильтр `genre` по умолчанию ищет по вхождению подстроки в slug'
+        )
+        assert found_names(client, {'genre': 'hor', **exact}) == [], (
+            'Проверьте, что `slug_match=exact` сравнивает slug точно'
+        )
+        assert found_names(client, {'genre': 'horror,drama', **exact}) == ['Комедия ужасов', 'Проект', 'Поворот туда'], (
+            'Проверьте, что фильтр `genre` со списком через запятую возвращает '
+            'произведения с любым из жанров без повторов'
+        )
+        assert found_names(client, {'genre': 'horror,drama', 'genre_match': 'all', **exact}) == ['Комедия ужасов'], (
+            'Проверьте, что фильтр `genre` с `genre_match=all` возвращает '
+            'только произведения со всеми жанрами'
+        )
+        assert found_names(client, {'genre': 'horror,unknown', 'genre_match': 'all', **exact}) == [], (
+            'Проверьте, что фильтр `genre` с `genre_match=all` и несуществующим жанром ничего не возвращает'
+        )
+        for params in ({'genre': 'hor', 'genre_match': 'all'}, {'genre': 'hor', 'slug_match': 'prefix'}):
+            response = client.get('/api/v1/titles/', params)
+            assert response.status_code == 400, (
+                f'Проверьте, что фильтр с параметрами {params} возвращает статус 400'
+            )
+        assert found_names(client, {'category': 'books,films', **exact}) == ['Комедия ужасов', 'Проект', 'Поворот туда'], (
+            'Проверьте, что фильтр `category` принимает список slug через запятую'
+        )
+        assert found_names(client, {'category': 'book'}) == ['Комедия ужасов', 'Проект'], (
+            'Проверьте, что фильтр `category` по умолчанию ищет по вхождению подстроки в slug'
+        )
+        assert found_names(client, {'category': 'books', 'genre': 'drama', **exact}) == ['Комедия ужасов', 'Проект'], (
+            'Проверьте, что фильтры `category` и `genre` комбинируются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_search_index_after_table_rebuild(self, client, admin_client):
+        from django.db import connection
+        from reviews import search
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        field = Title._meta.get_field('description')
+        # Миграция поля в SQLite пересоздает таблицу и теряет триггеры
+        with connection.schema_editor() as editor:
+            editor.alter_field(Title, field, field)
+        search._indexed.discard(connection.alias)
+        assert not search.has_search_index(), (
+            'Проверьте, что индекс без триггеров не считается рабочим'
+        )
+        search.create_search_index()
+        Title.objects.filter(name='Проект').update(name='Запуск')
+        assert found_names(client, {'search': 'запуск'}) == ['Запуск'], (
+            'Проверьте, что post_migrate восстанавливает триггеры поискового индекса'
+        )
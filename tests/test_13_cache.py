@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_comments
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+    )
+    return response.json(), len(context.captured_queries)
+
+
+class Test13Cache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_reads_and_invalidation(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        comments_url = f'{review_url}comments/'
+        # Списки и произведения с ETag делают один запрос версии данных
+        urls = {'/api/v1/titles/': 1, title_url: 1, f'{title_url}reviews/': 1, comments_url: 0,
+                '/api/v1/categories/': 0, '/api/v1/genres/': 0}
+        for url, stamp_queries in urls.items():
+            first, _ = get_with_queries(client, url)
+            second, queries = get_with_queries(client, url)
+            assert first == second and queries == stamp_queries, (
+                f'Проверьте, что повторный анонимный GET запрос `{url}` отдается из кэша'
+            )
+
+        admin_client.patch(comments_url + f'{comments[0]["id"]}/', data={'text': 'Новый текст'})
+        data, queries = get_with_queries(client, comments_url)
+        assert queries > 0 and 'Новый текст' in [comment['text'] for comment in data['results']], (
+            'Проверьте, что изменение комментария сбрасывает кэш списка комментариев'
+        )
+        _, queries = get_with_queries(client, '/api/v1/titles/')
+        assert queries == 1, (
+            'Проверьте, что изменение комментария не сбрасывает кэш списка произведений'
+        )
+
+        admin_client.patch(review_url, data={'score': 8})
+        data, queries = get_with_queries(client, title_url)
+        assert queries > 0 and data['rating'] == 5, (
+            'Проверьте, что изменение отзыва сбрасывает кэш произведения'
+        )
+        data, _ = get_with_queries(client, '/api/v1/titles/')
+        assert [title['rating'] for title in data['results'] if title['id'] == titles[0]['id']] == [5], (
+            'Проверьте, что изменение отзыва сбрасывает кэш списка произведений'
+        )
+
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'genre': ['horror']})
+        data, _ = get_with_queries(client, f'/api/v1/titles/{titles[1]["id"]}/')
+        assert [genre['slug'] for genre in data['genre']] == ['horror'], (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_author_rename(self, client, admin_client, admin):
+        from django.contrib.auth import get_user_model
+
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for url in (reviews_url, comments_url):
+            client.get(url)
+        auth_client(user).patch('/api/v1/users/me/', data={'username': 'renamed'})
+        get_user_model().objects.filter(pk=moderator.pk).update(username='renamed_too')
+        for url in (reviews_url, comments_url):
+            authors = {item['author'] for item in get_with_queries(client, url)[0]['results']}
+            assert {'renamed', 'renamed_too'} <= authors, (
+                f'Проверьте, что переименование автора сбрасывает кэш ответа `{url}`'
+            )
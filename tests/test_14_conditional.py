@@ -0,0 +1,115 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test14ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_etag_not_modified(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        urls = ('/api/v1/titles/', title_url, f'{title_url}reviews/')
+        etags = {}
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 200 and response.has_header('ETag'), (
+                f'Проверьте, что GET запрос `{url}` возвращает заголовок `ETag`'
+            )
+            assert response.has_header('Last-Modified'), (
+                f'Проверьте, что GET запрос `{url}` возвращает заголовок `Last-Modified`'
+            )
+            etags[url] = response['ETag']
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 304 and not response.content, (
+                f'Проверьте, что GET запрос `{url}` с актуальным `If-None-Match` возвращает статус 304'
+            )
+
+        admin_client.patch(f'{title_url}reviews/{reviews[0]["id"]}/', data={'text': 'Новый текст'})
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 200, (
+                f'Проверьте, что после изменения отзыва GET запрос `{url}` '
+                'со старым `If-None-Match` возвращает статус 200'
+            )
+
+        response = client.get(title_url)
+        response = client.get(title_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        assert response.status_code == 304, (
+            f'Проверьте, что GET запрос `{title_url}` с актуальным `If-Modified-Since` возвращает статус 304'
+        )
+
+        etag = client.get(title_url)['ETag']
+        from reviews.models import Genre
+        Genre.objects.filter(slug='horror').get().save()
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение жанра произведения меняет его `ETag`'
+        )
+        response = client.get('/api/v1/titles/?page=2', HTTP_IF_NONE_MATCH=etags['/api/v1/titles/'])
+        assert response.status_code != 304, (
+            'Проверьте, что `ETag` списка произведений зависит от параметров запроса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_list_version(self, client, admin_client, admin, django_assert_num_queries):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        etag = client.get('/api/v1/titles/')['ETag']
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что `ETag` списка произведений проверяется одним запросом к версии списка'
+        )
+
+        response = admin_client.post('/api/v1/titles/', data={'name': 'Новое', 'year': 2000, 'category': 'films'})
+        assert response.status_code == 201
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что добавление произведения меняет `ETag` списка произведений'
+        )
+        etag = response['ETag']
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что удаление произведения меняет `ETag` списка произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_invalid_pk(self, client):
+        response = client.get('/api/v1/titles/abc/')
+        assert response.status_code == 404, (
+            'Проверьте, что GET запрос `/api/v1/titles/abc/` возвращает статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_write_contract(self, admin_client):
+        admin_client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        admin_client.post('/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'})
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Новое', 'year': 2000, 'genre': ['drama'], 'category': 'films'
+        })
+        assert response.status_code == 201
+        title_url = f'/api/v1/titles/{response.json()["id"]}/'
+        for response in (response, admin_client.patch(title_url, data={'year': 2001})):
+            assert not {'version', 'modified'} & set(response.json()), (
+                'Проверьте, что служебные поля `version` и `modified` не попадают в ответ на запись'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_author_rename(self, client, admin_client, admin):
+        from django.contrib.auth import get_user_model
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        response = auth_client(user).patch('/api/v1/users/me/', data={'username': 'renamed'})
+        assert response.status_code == 200
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что переименование автора меняет `ETag` списка отзывов'
+        )
+        etag = response['ETag']
+        get_user_model().objects.filter(pk=moderator.pk).update(username='renamed_too')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что переименование автора через `QuerySet.update()` меняет `ETag` списка отзывов'
+        )
@@ -0,0 +1,104 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def get_token_client(user):
+    client = APIClient()
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == 200, (
+        'Проверьте, что POST запрос `/api/v1/auth/token/` возвращает токен'
+    )
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return client
+
+
+def user_queries(captured):
+    return [query['sql'] for query in captured if '"reviews_user"' in query['sql']]
+
+
+class Test15Auth:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_claims_without_user_query(self, admin):
+        client = get_token_client(admin)
+        with CaptureQueriesContext(connection) as captured:
+            response = client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == 201, (
+            'Проверьте, что администратор с токеном из `/api/v1/auth/token/` может создать категорию'
+        )
+        assert not user_queries(captured), (
+            'Проверьте, что права проверяются по claims токена без запроса пользователя из БД'
+        )
+
+        from reviews.models import Title
+        title = Title.objects.create(name='Поворот не туда', year=2000)
+        response = client.post(f'/api/v1/titles/{title.id}/reviews/', data={'text': 'Текст', 'score': 5})
+        assert response.status_code == 201 and response.json()['author'] == admin.username, (
+            'Проверьте, что отзыв, созданный по токену с claims, сохраняется с автором из токена'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change(self, admin):
+        client = get_token_client(admin)
+        admin.role = 'user'
+        admin.save()
+        with CaptureQueriesContext(connection) as captured:
+            response = client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == 403, (
+            'Проверьте, что после смены роли старый токен не дает прав администратора'
+        )
+        assert not user_queries(captured), (
+            'Проверьте, что новая роль берется из кэша без запроса пользователя из БД'
+        )
+
+        admin.is_active = False
+        admin.save()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 401, (
+            'Проверьте, что заблокированный пользователь не проходит аутентификацию по старому токену'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_deleted_user(self, user):
+        client = get_token_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.delete()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 401, (
+            'Проверьте, что токен удаленного пользователя не проходит аутентификацию'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_lost_state_and_bulk_update(self, admin):
+        from django.contrib.auth import get_user_model
+        from django.core.cache import caches
+
+        client = get_token_client(admin)
+        get_user_model().objects.filter(pk=admin.pk).update(role='user')
+        response = client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == 403, (
+            'Проверьте, что после `QuerySet.update()` роли старый токен не дает прав администратора'
+        )
+
+        admin.role = 'admin'
+        admin.save()
+        client = get_token_client(admin)
+        # Состояние вытеснено из кэша, роль меняли в другом процессе
+        get_user_model().objects.filter(pk=admin.pk).update(role='user')
+        for cache in caches.all():
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == 403 and len(user_queries(captured)) == 1, (
+            'Проверьте, что без состояния в кэше роль читается из БД, а не из claims токена'
+        )
+        get_user_model().objects.filter(pk=admin.pk).delete()
+        for cache in caches.all():
+            cache.clear()
+        assert client.get('/api/v1/users/me/').status_code == 401
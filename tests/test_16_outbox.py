@@ -0,0 +1,115 @@
+import datetime as dt
+import smtplib
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class Test16Outbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues_email(self, client):
+        from reviews.models import OutboxEmail
+
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что `/api/v1/auth/signup/` не отправляет письмо синхронно'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.to == data['email'] and 'Код подтверждения' in email.body, (
+            'Проверьте, что `/api/v1/auth/signup/` ставит письмо с кодом подтверждения в очередь'
+        )
+
+        call_command('sendoutbox')
+        assert len(mail.outbox) == 1 and mail.outbox[0].to == [data['email']], (
+            'Проверьте, что команда `sendoutbox` отправляет письма из очереди'
+        )
+        email.refresh_from_db()
+        assert email.sent is not None and email.attempts == 1, (
+            'Проверьте, что отправленное письмо помечается в очереди'
+        )
+        call_command('sendoutbox')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда `sendoutbox` не отправляет письмо повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_batches_share_connection(self):
+        from reviews.outbox import enqueue_email, send_batch
+
+        for number in range(5):
+            enqueue_email('Тема', 'Текст', None, [f'user{number}@yamdb.fake'])
+        with mock.patch.object(EmailBackend, 'open', autospec=True) as open_:
+            assert send_batch(batch_size=3) == (3, 0)
+        assert open_.call_count == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        call_command('sendoutbox', batch_size=3)
+        assert len(mail.outbox) == 5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_retry_with_backoff(self):
+        from reviews.models import OutboxEmail
+        from reviews.outbox import enqueue_email
+
+        email = enqueue_email('Тема', 'Текст', None, ['user@yamdb.fake'])
+        with mock.patch.object(
+                EmailBackend, 'send_messages', side_effect=smtplib.SMTPException('down')
+        ):
+            call_command('sendoutbox', backoff=60)
+        email.refresh_from_db()
+        assert email.sent is None and email.attempts == 1 and 'down' in email.last_error, (
+            'Проверьте, что неудачная отправка записывается в очередь'
+        )
+        assert email.next_attempt > timezone.now() + dt.timedelta(seconds=50), (
+            'Проверьте, что повторная отправка откладывается'
+        )
+
+        call_command('sendoutbox')
+        assert not mail.outbox, (
+            'Проверьте, что письмо не отправляется раньше срока повтора'
+        )
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        call_command('sendoutbox')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что письмо отправляется при повторной попытке'
+        )
+
+        email = enqueue_email('Тема', 'Текст', None, ['user@yamdb.fake'])
+        with mock.patch.object(
+                EmailBackend, 'send_messages', side_effect=smtplib.SMTPException('down')
+        ):
+            for _ in range(3):
+                call_command('sendoutbox', backoff=0, max_attempts=2)
+        email.refresh_from_db()
+        assert email.attempts == 2 and email.sent is None, (
+            'Проверьте, что после `--max-attempts` попыток письмо больше не отправляется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_concurrent_senders(self):
+        from reviews.models import OutboxEmail
+        from reviews.outbox import claim, enqueue_email, send_batch
+
+        for number in range(3):
+            enqueue_email('Тема', 'Текст', None, [f'user{number}@yamdb.fake'])
+        # Второй отправитель прочитал те же письма до захвата первым
+        stale = list(OutboxEmail.objects.all())
+        second = []
+        with mock.patch.object(
+                EmailBackend, 'open', autospec=True,
+                side_effect=lambda backend: second.append(send_batch()) or True
+        ):
+            assert send_batch() == (3, 0)
+        assert second == [(0, 0)] and not claim(stale), (
+            'Проверьте, что захваченное письмо не достается другому отправителю'
+        )
+        assert len(mail.outbox) == 3 and set(OutboxEmail.objects.values_list('attempts', flat=True)) == {1}, (
+            'Проверьте, что каждое письмо отправляется один раз'
+        )
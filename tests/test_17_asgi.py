@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+def asgi_request(method, path, body=b'', headers=()):
+    from api_yamdb.asgi import application
+
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'path': path,
+        'query_string': query.encode(),
+        'headers': [
+            (b'host', b'testserver'), (b'content-length', str(len(body)).encode()), *headers
+        ],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return messages[0]['status'], dict(messages[0]['headers']), body
+
+
+class Test17Asgi:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_asgi_application(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        for url in ('/api/v1/titles/?year=1940', title_url, f'{title_url}reviews/'):
+            status, headers, body = asgi_request('GET', url)
+            response = client.get(url)
+            assert status == 200 and body == response.content, (
+                f'Проверьте, что ASGI-приложение отвечает на GET `{url}` так же, как WSGI'
+            )
+            assert headers[b'content-type'] == b'application/json'
+
+        status, headers, body = asgi_request(
+            'POST', '/api/v1/auth/signup/',
+            body=b'{"username": "asgi_user", "email": "asgi@yamdb.fake"}',
+            headers=[(b'content-type', b'application/json')]
+        )
+        assert status == 200, (
+            'Проверьте, что ASGI-приложение передает тело POST запроса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_benchservers(self, admin_client, admin, capsys):
+        create_reviews(admin_client, admin)
+        call_command('benchservers', requests=20, concurrency=4)
+        output = capsys.readouterr().out
+        for name in ('wsgi', 'asgi'):
+            assert f'{name}: ' in output and '0 errors' in output, (
+                f'Проверьте, что команда `benchservers` выводит скорость {name}'
+            )
+
+    def test_03_concurrent_requests(self):
+        from api_yamdb.asgi import WsgiToAsgi
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wsgi_application(environ, start_response):
+            # Оба запроса должны выполняться одновременно
+            barrier.wait()
+            start_response('200 OK', [])
+            return [b'']
+
+        application = WsgiToAsgi(wsgi_application, 2)
+        scope = {'type': 'http', 'method': 'GET', 'path': '/'}
+        statuses = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            statuses.append(message.get('status'))
+
+        async def main():
+            await asyncio.gather(*(
+                application(scope, receive, send) for _ in range(2)
+            ))
+
+        try:
+            asyncio.run(main())
+        finally:
+            application.executor.shutdown()
+        assert statuses.count(200) == 2, (
+            'Проверьте, что ASGI-приложение обрабатывает запросы параллельно'
+        )
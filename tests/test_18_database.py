@@ -0,0 +1,46 @@
+import pytest
+from django.core.management import call_command
+
+
+class Test18Database:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_pragmas(self, settings):
+        from django.db import connection
+        from reviews.pragmas import apply_pragmas
+
+        connection.settings_dict['PRAGMAS'] = {'cache_size': -4000, 'busy_timeout': 1234}
+        try:
+            apply_pragmas(sender=None, connection=connection)
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA busy_timeout')
+                assert cursor.fetchone()[0] == 1234, (
+                    'Проверьте, что PRAGMAS из настроек БД выполняются на новом соединении'
+                )
+                cursor.execute('PRAGMA cache_size')
+                assert cursor.fetchone()[0] == -4000
+        finally:
+            del connection.settings_dict['PRAGMAS']
+
+        profile = settings.DATABASE_PROFILES['tuned']
+        assert profile['CONN_MAX_AGE'] and profile['PRAGMAS']['journal_mode'] == 'WAL', (
+            'Проверьте, что профиль `tuned` включает WAL и постоянные соединения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_benchwrites(self, capsys):
+        from reviews.models import Title
+
+        title_count = Title.objects.count()
+        call_command('benchwrites', threads=2, writes=3)
+        output = capsys.readouterr().out
+        for profile in ('default', 'tuned'):
+            assert f'{profile}: ' in output, (
+                'Проверьте, что команда `benchwrites` выводит результат для каждого профиля'
+            )
+        assert output.count(' 0 errors') == 2, (
+            'Проверьте, что при конкурентной записи нет ошибок'
+        )
+        assert Title.objects.count() == title_count, (
+            'Проверьте, что команда `benchwrites` не пишет в основную базу'
+        )
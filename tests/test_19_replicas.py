@@ -0,0 +1,63 @@
+import pytest
+
+
+def slugs(response):
+    return {item['slug'] for item in response.json()['results']}
+
+
+class Test19Replicas:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reads_from_replica(self, client, admin_client, replica, settings):
+        from reviews.models import Category, Title
+
+        # Реплика считается догнавшей основную базу сразу после записи
+        settings.REPLICA_PIN_SECONDS = 0
+        admin_client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        replica()
+        Category.objects.create(name='Книга', slug='books')
+        Title.objects.create(name='Только в основной базе', year=2000)
+
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == 200 and slugs(response) == {'films'}, (
+            'Проверьте, что GET запрос `/api/v1/categories/` читает из реплики'
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что GET запрос `/api/v1/titles/` читает из реплики'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_read_your_writes(self, client, admin_client, replica, settings):
+        response = admin_client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == 201, (
+            'Проверьте, что запись при настроенных репликах идет в основную базу'
+        )
+        response = admin_client.get('/api/v1/categories/')
+        assert slugs(response) == {'films'}, (
+            'Проверьте, что после записи пользователь читает из основной базы'
+        )
+        assert not slugs(client.get('/api/v1/genres/')), (
+            'Проверьте, что другие ресурсы продолжают читаться из реплики'
+        )
+
+        from django.core.cache import caches
+        caches[settings.API_CACHE_ALIAS].clear()
+        assert not slugs(admin_client.get('/api/v1/categories/')), (
+            'Проверьте, что закрепление за основной базой временное'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_no_stale_cache_after_change(self, client, replica, settings):
+        from django.core.cache import caches
+        from reviews.models import Category
+
+        assert not slugs(client.get('/api/v1/categories/'))
+        Category.objects.create(name='Фильм', slug='films')
+        assert slugs(client.get('/api/v1/categories/')) == {'films'}, (
+            'Проверьте, что после изменения группу читают из основной базы, '
+            'а не кэшируют устаревший ответ реплики'
+        )
+        # Окно REPLICA_PIN_SECONDS прошло: ответ берется из кэша
+        caches[settings.API_CACHE_ALIAS].delete('api:changed:categories')
+        assert slugs(client.get('/api/v1/categories/')) == {'films'}
@@ -0,0 +1,63 @@
+import json
+import logging
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews
+
+
+class Test20QueryStats:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_server_timing_and_log(self, client, admin_client, admin, caplog, settings):
+        settings.QUERY_STATS_SAMPLE_RATE = 1
+        settings.QUERY_STATS_SERVER_TIMING = True
+        create_reviews(admin_client, admin)
+        with caplog.at_level(logging.INFO, logger='api.queries'):
+            with CaptureQueriesContext(connection) as captured:
+                response = client.get('/api/v1/titles/')
+        assert response.has_header('Server-Timing'), (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` со статистикой SQL'
+        )
+        server_timing = response['Server-Timing']
+        assert f'{len(captured)} queries' in server_timing and 'db-slowest;dur=' in server_timing, (
+            'Проверьте, что `Server-Timing` содержит число запросов и самый медленный запрос'
+        )
+        records = [json.loads(record.getMessage()) for record in caplog.records if record.name == 'api.queries']
+        assert records and records[-1]['path'] == '/api/v1/titles/', (
+            'Проверьте, что статистика запроса пишется в лог `api.queries` строкой JSON'
+        )
+        record = records[-1]
+        assert record['queries'] == len(captured) and record['status'] == 200
+        assert record['duplicates'] == 0, (
+            'Проверьте, что список произведений не выполняет повторяющихся запросов'
+        )
+
+        settings.QUERY_STATS_SERVER_TIMING = False
+        assert not client.get('/api/v1/titles/').has_header('Server-Timing'), (
+            'Проверьте, что без `DEBUG` в окружении `Server-Timing` не отдается анонимам'
+        )
+        assert admin_client.get('/api/v1/titles/').has_header('Server-Timing'), (
+            'Проверьте, что администратор получает `Server-Timing`'
+        )
+        settings.QUERY_STATS_SAMPLE_RATE = 0
+        assert not admin_client.get('/api/v1/titles/').has_header('Server-Timing'), (
+            'Проверьте, что `QUERY_STATS_SAMPLE_RATE = 0` отключает сбор статистики'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_duplicates(self):
+        from api.middleware import QueryStats
+        from reviews.models import Title
+
+        stats = QueryStats()
+        with connection.execute_wrapper(stats):
+            for pk in range(3):
+                Title.objects.filter(pk=pk).first()
+            Title.objects.count()
+        assert stats.count == 4 and stats.duplicates == 2, (
+            'Проверьте, что повторы одного SQL с разными параметрами считаются дубликатами'
+        )
+        assert stats.most_repeated()[1] == 3
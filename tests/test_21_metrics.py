@@ -0,0 +1,120 @@
+import pytest
+
+from .common import create_reviews
+
+
+@pytest.fixture
+def get_metrics(settings):
+    """GET /metrics с токеном METRICS_TOKEN."""
+    settings.METRICS_TOKEN = 'secret'
+    return lambda client: client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+
+
+@pytest.fixture
+def metrics_registry():
+    from api.metrics import registry
+
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+class Test21Metrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_metrics_endpoint(self, client, admin_client, admin, metrics_registry, get_metrics):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        metrics_registry.reset()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        client.get('/api/v1/titles/0/')
+
+        response = get_metrics(client)
+        assert response.status_code == 200 and response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что `/metrics` отдает метрики в текстовом формате Prometheus'
+        )
+        text = response.content.decode()
+        expected = (
+            'http_requests_total{method="GET",route="title-list",status="200"} 2',
+            'http_requests_total{method="GET",route="reviews-list",status="200"} 1',
+            'http_requests_total{method="GET",route="title-detail",status="404"} 1',
+            'http_request_duration_seconds_bucket{le="+Inf",method="GET",route="title-list"} 2',
+            'http_request_duration_seconds_count{method="GET",route="title-list"} 2',
+            'http_response_size_bytes_count{method="GET",route="title-list"} 2',
+            'api_cache_requests_total{result="hit"} 1',
+            'email_outbox_pending 0',
+        )
+        for line in expected:
+            assert line in text, (
+                f'Проверьте, что `/metrics` содержит строку `{line}`'
+            )
+        assert 'db_queries_total{route="title-list"} ' in text, (
+            'Проверьте, что `/metrics` считает запросы к БД по маршрутам'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_multiprocess_dir(self, client, settings, tmp_path, metrics_registry, get_metrics):
+        from api.metrics import Registry
+
+        settings.METRICS_DIR = str(tmp_path)
+        other_worker = Registry()
+        other_worker.inc('http_requests_total', {'route': 'title-list', 'method': 'GET', 'status': '200'}, 5)
+        other_worker.observe('http_request_duration_seconds', {'route': 'title-list', 'method': 'GET'}, 0.2)
+        other_worker.flush(force=True)
+
+        client.get('/api/v1/titles/')
+        text = get_metrics(client).content.decode()
+        assert 'http_requests_total{method="GET",route="title-list",status="200"} 6' in text, (
+            'Проверьте, что `/metrics` складывает счетчики всех процессов из `METRICS_DIR`'
+        )
+        assert 'http_request_duration_seconds_count{method="GET",route="title-list"} 2' in text, (
+            'Проверьте, что `/metrics` складывает гистограммы всех процессов из `METRICS_DIR`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_outbox_gauges_and_access(self, client, settings, get_metrics):
+        from reviews.models import OutboxEmail
+        from reviews.outbox import enqueue_email
+
+        for number in range(3):
+            enqueue_email('Тема', 'Текст', None, [f'user{number}@yamdb.fake'])
+        OutboxEmail.objects.filter(pk=OutboxEmail.objects.order_by('id').first().pk).update(
+            attempts=settings.OUTBOX_MAX_ATTEMPTS
+        )
+        text = get_metrics(client).content.decode()
+        assert 'email_outbox_pending 2' in text and 'email_outbox_dead 1' in text, (
+            'Проверьте, что письма без попыток в запасе считаются в `email_outbox_dead`, '
+            'а не в `email_outbox_pending`'
+        )
+
+        assert client.get('/metrics').status_code == 403, (
+            'Проверьте, что `/metrics` без токена закрыт, в том числе для 127.0.0.1'
+        )
+        assert client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code == 403
+        settings.METRICS_TOKEN = None
+        assert client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code == 403, (
+            'Проверьте, что без `METRICS_TOKEN` в настройках `/metrics` закрыт'
+        )
+        settings.METRICS_ALLOWED_IPS = ['10.0.0.1']
+        assert client.get('/metrics', REMOTE_ADDR='10.0.0.1').status_code == 200, (
+            'Проверьте, что `/metrics` доступен с адресов из `METRICS_ALLOWED_IPS`'
+        )
+        assert client.get('/metrics').status_code == 403
+
+    def test_04_concurrent_flush(self, settings, tmp_path, metrics_registry):
+        from concurrent.futures import ThreadPoolExecutor
+
+        settings.METRICS_DIR = str(tmp_path)
+        for number in range(200):
+            metrics_registry.inc('http_requests_total', {'route': f'route-{number}', 'method': 'GET', 'status': '200'})
+
+        def flush_and_collect(_):
+            metrics_registry.flush(force=True)
+            return len(metrics_registry.collect())
+
+        with ThreadPoolExecutor(8) as executor:
+            counts = set(executor.map(flush_and_collect, range(200)))
+        assert counts == {200}, (
+            'Проверьте, что одновременные сбросы метрик из потоков не портят файл процесса'
+        )
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from .common import create_reviews
+
+
+class Test22BenchApi:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_scenarios_and_baseline(self, admin_client, admin, tmp_path, capsys):
+        from reviews.models import Comment, Review
+
+        create_reviews(admin_client, admin)
+        counts = Review.objects.count(), Comment.objects.count()
+        baseline = tmp_path / 'baseline.json'
+        call_command('benchapi', iterations=40, save_baseline=str(baseline))
+        output = capsys.readouterr().out
+        results = json.loads(baseline.read_text())
+        for step in ('title-list', 'title-detail', 'reviews-list', 'comments-list', 'users-search'):
+            assert step in results['steps'] and step in output, (
+                f'Проверьте, что команда `benchapi` измеряет шаг `{step}`'
+            )
+        assert results['total']['errors'] == 0 and results['total']['rps'] > 0
+        assert set(results['total']) >= {'p50', 'p95', 'p99'}, (
+            'Проверьте, что команда `benchapi` считает p50/p95/p99'
+        )
+        assert (Review.objects.count(), Comment.objects.count()) == counts, (
+            'Проверьте, что команда `benchapi` пишет в копию базы, а не в основную'
+        )
+
+        call_command('benchapi', iterations=40, baseline=str(baseline), threshold=100)
+        assert 'No regressions' in capsys.readouterr().out
+
+        for summary in (results['total'], *results['steps'].values()):
+            summary['p95'] = 0.001
+        baseline.write_text(json.dumps(results))
+        with pytest.raises(CommandError, match='regressions'):
+            call_command('benchapi', iterations=40, baseline=str(baseline))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_unexpected_status_is_error(self):
+        from reviews.management.commands.benchapi import Command, Session
+
+        session = Session({}, 0)
+        session.request('title-detail', 'get', '/api/v1/titles/0/', (200,))
+        session.request('title-list', 'get', '/api/v1/titles/', (200,))
+        session.request('titles-create', 'post', '/api/v1/titles/', (401,), data={})
+        results = Command().report(session.samples, elapsed=1)
+        assert results['steps']['title-detail']['errors'] == 1, (
+            'Проверьте, что `benchapi` считает ошибкой ответ 404 вместо ожидаемого 200'
+        )
+        assert results['steps']['title-list']['errors'] == 0
+        assert results['steps']['titles-create']['errors'] == 0
+        assert results['total']['errors'] == 1
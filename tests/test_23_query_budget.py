@@ -0,0 +1,62 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from .common import auth_client, create_comments
+from .fixtures.fixture_queries import QUERY_BUDGETS, QueryBudget
+
+
+class Test23QueryBudget:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_full_pages_within_budget(self, client, admin_client, admin, query_budget):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for number in range(4):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {number}', 'year': 2000,
+                'genre': ['horror', 'comedy', 'drama'], 'category': 'films'
+            })
+            author = get_user_model().objects.create_user(
+                username=f'Author{number}', email=f'author{number}@yamdb.fake'
+            )
+            author_client = auth_client(author)
+            author_client.post(reviews_url, data={'text': 'Текст', 'score': 5})
+            author_client.post(comments_url, data={'text': 'Текст'})
+        client.post('/api/v1/auth/signup/', data={'username': 'NewUser', 'email': 'new@yamdb.fake'})
+
+        # Полные страницы: лишний запрос на строку превысит бюджет
+        for api_client in (client, admin_client):
+            for url in ('/api/v1/titles/', f'/api/v1/titles/{titles[0]["id"]}/', reviews_url, comments_url):
+                assert api_client.get(url).status_code == 200
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        assert set(QUERY_BUDGETS) <= {key for key, _ in query_budget.checked}, (
+            'Проверьте, что тест проходит по всем маршрутам из `QUERY_BUDGETS`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_budget_exceeded(self):
+        budget = QueryBudget({('title-list', 'GET'): 0})
+        environ = {'PATH_INFO': '/api/v1/titles/', 'REQUEST_METHOD': 'GET'}
+        budget.wrap(connection)
+        try:
+            budget.started(None, environ)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            budget.finished(None)
+        finally:
+            budget.unwrap()
+        assert budget.exceeded == [(('title-list', 'GET'), 1)], (
+            'Проверьте, что превышение бюджета запоминается, а не падает в сигнале'
+        )
+        with pytest.raises(AssertionError, match='title-list'):
+            budget.check()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_replica_queries_counted(self, client, replica, query_budget):
+        client.get('/api/v1/titles/')
+        (key, queries), = query_budget.checked
+        assert key == ('title-list', 'GET') and queries > 0, (
+            'Проверьте, что бюджет учитывает запросы к репликам'
+        )
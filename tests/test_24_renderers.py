@@ -0,0 +1,75 @@
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+PAYLOAD = {
+    'text': 'Текст с разделителем строк',
+    'created': timezone.make_aware(datetime.datetime(2021, 9, 1, 12, 30, 15, 123456), timezone.utc),
+    'day': datetime.date(2021, 9, 1),
+    'price': Decimal('1.50'),
+    'lazy': gettext_lazy('Отзыв'),
+    'ids': {1, 2},
+    'nested': [{'rating': 7.5, 'empty': None, 'ok': True}],
+}
+
+
+class Test24Renderers:
+
+    @pytest.mark.parametrize('use_orjson', (True, False))
+    def test_01_render_parity(self, use_orjson, monkeypatch):
+        from api import renderers
+
+        if not use_orjson:
+            monkeypatch.setattr(renderers, 'orjson', None)
+        fast = renderers.FastJSONRenderer()
+        assert fast.render(PAYLOAD) == JSONRenderer().render(PAYLOAD), (
+            'Проверьте, что `FastJSONRenderer` отдает те же байты, что и `JSONRenderer`'
+        )
+        assert fast.render(None) == b''
+        context = {'indent': 4}
+        assert fast.render(PAYLOAD, renderer_context=context) == JSONRenderer().render(
+            PAYLOAD, renderer_context=context
+        )
+
+    @pytest.mark.parametrize('use_orjson', (True, False))
+    def test_02_parse(self, use_orjson, monkeypatch):
+        from api import renderers
+
+        if not use_orjson:
+            monkeypatch.setattr(renderers, 'orjson', None)
+        body = '{"text": "Текст", "score": 5, "list": [1.5, null]}'.encode()
+        assert renderers.FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+        with pytest.raises(ParseError):
+            renderers.FastJSONParser().parse(io.BytesIO(b'{"text": '))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_api_defaults(self, admin_client):
+        # pytest-django выключает settings.DEBUG, значение из модуля настроек
+        from api_yamdb.settings import DEBUG
+
+        renderer_classes = settings.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']
+        assert renderer_classes[0] == 'api.renderers.FastJSONRenderer', (
+            'Проверьте, что `FastJSONRenderer` - рендерер по умолчанию'
+        )
+        assert ('rest_framework.renderers.BrowsableAPIRenderer' in renderer_classes) == DEBUG, (
+            'Проверьте, что HTML-версия API отключена без `DEBUG`'
+        )
+        response = admin_client.post(
+            '/api/v1/categories/', data='{"name": "Фильм", "slug": "films"}', content_type='application/json'
+        )
+        assert response.status_code == 201 and response['Content-Type'] == 'application/json'
+        assert response.content == '{"name":"Фильм","slug":"films"}'.encode()
+
+    def test_04_benchjson(self, capsys):
+        call_command('benchjson', titles=20, repeat=2)
+        output = capsys.readouterr().out
+        assert '20 titles' in output and 'render: drf' in output and 'parse: drf' in output
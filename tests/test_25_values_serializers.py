@@ -0,0 +1,120 @@
+import pytest
+from django.core.cache import caches
+from rest_framework.renderers import JSONRenderer
+
+from .common import auth_client, create_comments
+
+
+def get_both(client, url, monkeypatch):
+    """Ответы по быстрому пути .values() и через обычные сериализаторы."""
+    from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+
+    responses = []
+    for enabled in (True, False):
+        for cache in caches.all():
+            cache.clear()
+        with monkeypatch.context() as patch:
+            if not enabled:
+                for viewset in (TitleViewSet, ReviewViewSet, CommentViewSet):
+                    patch.setattr(viewset, 'values_serializer_class', None)
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+        )
+        responses.append(response.content)
+    return responses
+
+
+class Test25ValuesSerializers:
+
+    @pytest.fixture
+    def data(self, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        # Без категории, без жанров, без отзывов; разделитель строк в тексте
+        from reviews.models import Genre, Title
+
+        title = Title.objects.create(name='Без категории', year=1999, description='Строка\u2028вторая')
+        title.genre.set(Genre.objects.all())
+        admin_client.post('/api/v1/titles/', data={'name': 'Без жанров', 'year': 2001, 'category': 'books'})
+        for number in range(3):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {number}', 'year': 2010, 'genre': ['comedy'], 'category': 'films'
+            })
+        auth_client(user).post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Отзыв', 'score': 7}
+        )
+        return comments, reviews, titles
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_list_parity(self, client, admin_client, data, monkeypatch):
+        urls = (
+            '/api/v1/titles/', '/api/v1/titles/?page=2', '/api/v1/titles/?pagination=cursor',
+            '/api/v1/titles/?genre=horror', '/api/v1/titles/?category=films,books&slug_match=exact',
+            '/api/v1/titles/?search=Поворот', '/api/v1/titles/?year=1999',
+        )
+        for url in urls:
+            fast, regular = get_both(client, url, monkeypatch)
+            assert fast == regular, (
+                f'Проверьте, что GET запрос `{url}` через .values() отдает те же байты, '
+                'что и `TitleDisplaySerializer`'
+            )
+        fast, _ = get_both(admin_client, '/api/v1/titles/', monkeypatch)
+        assert '"category":null' in fast.decode() and '\\u2028' in fast.decode()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_comment_list_parity(self, client, admin_client, data, monkeypatch):
+        comments, reviews, titles = data
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        urls = (
+            reviews_url, f'{reviews_url}?pagination=cursor',
+            comments_url, f'{comments_url}?pagination=cursor',
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+        )
+        for api_client in (client, admin_client):
+            for url in urls:
+                fast, regular = get_both(api_client, url, monkeypatch)
+                assert fast == regular, (
+                    f'Проверьте, что GET запрос `{url}` через .values() отдает те же байты, '
+                    'что и обычный сериализатор'
+                )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_serializer_parity(self, data):
+        from api.querysets import optimize_queryset
+        from api.serializers import (CommentSerializer, CommentValuesSerializer, ReviewSerializer,
+                                     ReviewValuesSerializer, TitleDisplaySerializer, TitleValuesSerializer)
+        from reviews.models import Comment, Review, Title
+
+        pairs = (
+            (Title.objects.order_by('-id'), TitleDisplaySerializer, TitleValuesSerializer),
+            (Review.objects.select_related('author'), ReviewSerializer, ReviewValuesSerializer),
+            (Comment.objects.select_related('author'), CommentSerializer, CommentValuesSerializer),
+        )
+        for queryset, serializer_class, values_class in pairs:
+            regular = serializer_class(optimize_queryset(queryset, serializer_class), many=True).data
+            fast = values_class(values_class.get_values(queryset), many=True).data
+            assert JSONRenderer().render(fast) == JSONRenderer().render(regular), (
+                f'Проверьте, что `{values_class.__name__}` совпадает с `{serializer_class.__name__}`'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_switch_per_view(self, client, data, monkeypatch):
+        from api.serializers import TitleValuesSerializer
+
+        calls = []
+        get_values = TitleValuesSerializer.get_values.__func__
+        monkeypatch.setattr(
+            TitleValuesSerializer, 'get_values',
+            classmethod(lambda cls, queryset: calls.append(cls) or get_values(cls, queryset))
+        )
+        client.get('/api/v1/titles/')
+        assert calls == [TitleValuesSerializer], (
+            'Проверьте, что список произведений использует `TitleValuesSerializer`'
+        )
+        get_both(client, '/api/v1/titles/?page=2', monkeypatch)
+        assert len(calls) == 2, (
+            'Проверьте, что `values_serializer_class = None` отключает быстрый путь'
+        )
+        titles = client.get('/api/v1/titles/').json()['results']
+        assert client.get(f'/api/v1/titles/{titles[0]["id"]}/').json() == titles[0]